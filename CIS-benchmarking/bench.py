@@ -0,0 +1,316 @@
+"""
+Benchmark harness for the CIS extraction pipeline.
+
+Runs the same streaming scan_benchmark path cis_extract runs, then row building, DataFrame build
+and output writing, on the bundled benchmark PDF and on synthetic benchmark PDFs, and reports
+pages/sec, controls/sec, peak RSS and the wall time of each stage. Stage times are the ones the
+pipeline itself records in instrumentation.stats. Results are saved as JSON so runs can be
+compared across commits.
+
+Example:
+    python CIS-benchmarking/bench.py -o bench_before.json
+    python CIS-benchmarking/bench.py --sizes 100 1000 --repeat 3 -o bench_after.json --compare bench_before.json
+    python CIS-benchmarking/bench.py --cache warm -o bench_cached.json
+"""
+import argparse
+import datetime
+import json
+import logging
+import math
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pymupdf  # PyMuPDF
+
+from cis_extract import output_row, scan_benchmark
+from instrumentation import stats
+from output_sinks import SINKS, open_sink
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+# Bundled benchmark PDF
+BUNDLED_PDF = os.path.join(BASE_DIR, "documents", "CIS_IBM_AIX_7.1_Benchmark_v2.1.0_ARCHIVE.pdf")
+
+# Synthetic PDFs are generated once per size and reused between runs
+SYNTHETIC_DIR = os.path.join(BASE_DIR, ".cache", "bench")
+
+# Default synthetic document sizes (pages)
+DEFAULT_SIZES = (100, 1000, 5000)
+
+# Layout of the synthetic benchmarks
+CONTROLS_PER_CATEGORY = 49
+TOC_LINES_PER_PAGE = 45
+
+# Stages in pipeline order (as recorded in instrumentation.stats)
+STAGES = ("outline", "cache lookup", "decode", "cache read", "scan", "fingerprint", "cache write", "rows", "dataframe", "write")
+
+# Page text cache modes: "off" decodes every run with PyMuPDF, "cold" starts every run from an
+# empty cache (decode plus cache write) and "warm" serves every run from a cache filled beforehand
+CACHE_MODES = ("off", "cold", "warm")
+
+
+def synthetic_pdf(page_count: int) -> str:
+    """
+    Returns the path of a synthetic CIS-style benchmark PDF with page_count pages, generating it on
+    first use: a cover page, a dot-leader Table of Contents, then numbered category pages each
+    followed by one recommendation page per control.
+    """
+    path = os.path.join(SYNTHETIC_DIR, f"synthetic_{page_count}.pdf")
+    if os.path.exists(path):
+        return path
+    os.makedirs(SYNTHETIC_DIR, exist_ok=True)
+
+    # Body pages after the cover and TOC: a category page, then up to CONTROLS_PER_CATEGORY controls
+    toc_page_count = max(1, math.ceil(page_count / TOC_LINES_PER_PAGE))
+    body_pages = []
+    category = 0
+    while len(body_pages) < page_count - 1 - toc_page_count:
+        if len(body_pages) % (CONTROLS_PER_CATEGORY + 1) == 0:
+            category += 1
+            control = 0
+            body_pages.append((str(category), f"Synthetic Category {category}", None))
+        else:
+            control += 1
+            status = "Automated" if control % 3 else "Manual"
+            body_pages.append((f"{category}.{control}", f"Ensure synthetic setting {category}.{control} is configured", status))
+
+    first_body_page = 1 + toc_page_count
+    toc_lines = []
+    for offset, (number, title, status) in enumerate(body_pages):
+        label = f"{number} {title}" + (f" ({status})" if status else "")
+        toc_lines.append(f"{label} {'.' * max(4, 90 - len(label))} {first_body_page + offset}")
+
+    doc = pymupdf.open()
+    doc.new_page().insert_text((72, 72), f"Page 0\nCIS Synthetic Benchmark\nv1.0.0 - {page_count} pages", fontsize=10)
+    for toc_page in range(toc_page_count):
+        lines = toc_lines[toc_page * TOC_LINES_PER_PAGE:(toc_page + 1) * TOC_LINES_PER_PAGE]
+        text = f"Page {1 + toc_page}\nTable of Contents\n" + "\n".join(lines)
+        doc.new_page().insert_text((36, 36), text, fontsize=7)
+    for offset, (number, title, status) in enumerate(body_pages):
+        page_number = first_body_page + offset
+        if status is None:
+            text = f"Page {page_number}\n{number} {title}\nThis section contains synthetic recommendations."
+        else:
+            level = "Level 1" if int(number.split(".")[1]) % 2 else "Level 2"
+            text = "\n".join([
+                f"Page {page_number}",
+                f"{number} {title} ({status})",
+                "Profile Applicability:",
+                f"•  {level}",
+                "Description:",
+                f"The synthetic setting {number} controls access to a system resource.",
+                "Rationale:",
+                "Restricting this setting reduces the attack surface of the system.",
+                "Audit:",
+                f"lssec -f /etc/security/user -s default -a setting_{number.replace('.', '_')}",
+                "The above command should yield the expected value.",
+                "Remediation:",
+                f"chsec -f /etc/security/user -s default -a setting_{number.replace('.', '_')}=true",
+                "Default Value:",
+                "false",
+                "References:",
+                "1. Synthetic reference",
+            ])
+        doc.new_page().insert_text((72, 72), text, fontsize=9)
+    doc.save(path)
+    doc.close()
+    return path
+
+
+def peak_rss_mb() -> float:
+    """
+    Peak resident set size of this process in MiB, or None where the resource module is unavailable.
+    """
+    try:
+        import resource
+    except ImportError:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in bytes on macOS and in KiB elsewhere
+    return round(peak / (1024 * 1024 if sys.platform == "darwin" else 1024), 1)
+
+
+def warm_up(output_format: str) -> None:
+    """
+    Imports pandas and the output format's writer library (openpyxl, pyarrow) by building and
+    writing a one-row output, so their one-off import time is not counted in the first run.
+    """
+    row = {"Control": "1.1"}
+    try:
+        import pandas as pd
+    except ImportError:
+        pass
+    else:
+        pd.DataFrame([row])
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with open_sink(os.path.join(temp_dir, "warm-up" + output_format)) as sink:
+            sink.write(row)
+
+
+def run_pipeline(pdf_path: str, workers: int = 1, output_format: str = ".xlsx", cache_path: str = None) -> dict:
+    """
+    Runs one extraction of a PDF through cis_extract.scan_benchmark, streaming pages through the
+    page cache at cache_path (None decodes without it), then builds and writes its rows.
+
+    Returns:
+    - {"pages", "controls", "seconds", "stages": {stage: seconds}}, with the stage times taken
+      from instrumentation.stats and seconds the wall time of the whole run.
+    """
+    stats.reset()
+    start = time.perf_counter()
+    scan = scan_benchmark(pdf_path, workers=workers, cache_path=cache_path)
+    with stats.span("rows"):
+        rows = [output_row(control, scan["bodies"]) for control in scan["controls"]]
+
+    try:
+        import pandas as pd
+    except ImportError:
+        pass
+    else:
+        with stats.span("dataframe"):
+            pd.DataFrame(rows)
+
+    with tempfile.TemporaryDirectory() as temp_dir:
+        with stats.span("write"), open_sink(os.path.join(temp_dir, "controls" + output_format)) as sink:
+            for row in rows:
+                sink.write(row)
+    seconds = time.perf_counter() - start
+
+    counters = stats.counters
+    return {
+        "pages": counters.get("pages decoded", 0) + counters.get("pages from cache", 0),
+        "controls": len(scan["controls"]),
+        "seconds": seconds,
+        "stages": dict(stats.timings),
+    }
+
+
+def _bench_document(pdf_path: str, repeat: int, workers: int, output_format: str, cache: str = "off") -> dict:
+    """
+    Worker: benchmarks one document in a fresh process, so its peak RSS is not inflated by
+    earlier documents. The fastest run is kept, and each stage keeps its best time over the
+    repeats. Libraries the pipeline imports on first use are imported before the first run.
+    """
+    warm_up(output_format)
+    best = None
+    with tempfile.TemporaryDirectory() as cache_dir:
+        cache_path = None
+        if cache != "off":
+            cache_path = os.path.join(cache_dir, "page_text.sqlite")
+        if cache == "warm":
+            run_pipeline(pdf_path, workers, output_format, cache_path)
+        for _ in range(repeat):
+            if cache == "cold":
+                for suffix in ("", "-wal", "-shm"):
+                    if os.path.exists(cache_path + suffix):
+                        os.remove(cache_path + suffix)
+            run = run_pipeline(pdf_path, workers, output_format, cache_path)
+            if best is None:
+                best = run
+                continue
+            best["seconds"] = min(best["seconds"], run["seconds"])
+            for stage, seconds in run["stages"].items():
+                best["stages"][stage] = min(best["stages"].get(stage, seconds), seconds)
+    total = best["seconds"]
+    return {
+        "document": os.path.basename(pdf_path),
+        "pages": best["pages"],
+        "controls": best["controls"],
+        "stages": {stage: round(seconds, 4) for stage, seconds in best["stages"].items()},
+        "total_seconds": round(total, 4),
+        "pages_per_second": round(best["pages"] / total, 1) if total else None,
+        "controls_per_second": round(best["controls"] / total, 1) if total else None,
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_commit() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=BASE_DIR, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def print_results(results: list, baseline: dict = None) -> None:
+    """
+    Prints one line per document with the stage times, plus the change in total time against a
+    baseline run ({document: result}) when given.
+    """
+    header = f"{'Document':<28} {'Pages':>6} {'Ctrls':>6} {'Pages/s':>9} {'Ctrls/s':>9} {'RSS MB':>7}"
+    header += "".join(f" {stage[:8]:>8}" for stage in STAGES)
+    print("\n" + header + ("   vs base" if baseline else ""))
+    for result in results:
+        line = f"{result['document'][:28]:<28} {result['pages']:>6} {result['controls']:>6} "
+        line += f"{result['pages_per_second'] or 0:>9.1f} {result['controls_per_second'] or 0:>9.1f} "
+        line += f"{result['peak_rss_mb'] if result['peak_rss_mb'] is not None else '-':>7}"
+        for stage in STAGES:
+            seconds = result["stages"].get(stage)
+            line += f" {seconds:>8.3f}" if seconds is not None else f" {'-':>8}"
+        previous = (baseline or {}).get(result["document"])
+        if previous and previous.get("total_seconds"):
+            line += f"   {(result['total_seconds'] / previous['total_seconds'] - 1) * 100:+.1f}%"
+        print(line)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Benchmark the CIS extraction pipeline.")
+    parser.add_argument("--sizes", type=int, nargs="*", default=list(DEFAULT_SIZES), help="Synthetic PDF sizes in pages (default: 100 1000 5000)")
+    parser.add_argument("--pdf", action="append", default=[], help="Additional benchmark PDF to include (repeatable)")
+    parser.add_argument("--no-bundled", action="store_true", help="Skip the bundled AIX benchmark PDF")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs per document; the best time of each stage is kept")
+    parser.add_argument("--workers", type=int, default=1, help="PDF decoding processes (0 = one per CPU)")
+    parser.add_argument("--format", default=".xlsx", choices=sorted(SINKS), help="Output format timed by the write stage")
+    parser.add_argument("--cache", default="off", choices=CACHE_MODES, help="Page text cache: off (decode every run), cold (empty cache every run) or warm (default: off)")
+    parser.add_argument("-o", "--output", default="bench_results.json", help="JSON results file")
+    parser.add_argument("--compare", metavar="JSON", help="Earlier results file to compare total times against")
+    args = parser.parse_args(argv)
+
+    pdf_paths = list(args.pdf)
+    if not args.no_bundled and os.path.exists(BUNDLED_PDF):
+        pdf_paths.insert(0, BUNDLED_PDF)
+    for size in args.sizes:
+        logging.info(f"Preparing synthetic {size}-page benchmark...")
+        pdf_paths.append(synthetic_pdf(size))
+
+    results = []
+    for pdf_path in pdf_paths:
+        logging.info(f"Benchmarking {os.path.basename(pdf_path)}...")
+        with ProcessPoolExecutor(max_workers=1) as pool:
+            results.append(pool.submit(_bench_document, pdf_path, args.repeat, args.workers, args.format, args.cache).result())
+
+    baseline = None
+    if args.compare:
+        with open(args.compare, "r", encoding="utf-8") as f:
+            baseline = {result["document"]: result for result in json.load(f)["results"]}
+    print_results(results, baseline)
+
+    report = {
+        "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        "commit": git_commit(),
+        "python": platform.python_version(),
+        "pymupdf": pymupdf.__version__,
+        "platform": platform.platform(),
+        "repeat": args.repeat,
+        "workers": args.workers,
+        "format": args.format,
+        "cache": args.cache,
+        "results": results,
+    }
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    logging.info(f"Saved benchmark results to '{args.output}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
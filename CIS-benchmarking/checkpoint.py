@@ -0,0 +1,146 @@
+import heapq
+import os
+import pickle
+import sqlite3
+import zlib
+
+from instrumentation import stats
+from pdf_text import iter_page_texts, page_count
+
+# Decoded pages are committed to the journal in groups of this many pages
+CHECKPOINT_PAGES = 32
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS results (
+    run_key TEXT PRIMARY KEY,
+    pdf_path TEXT NOT NULL,
+    result BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    doc_key TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (doc_key, page_number)
+);
+"""
+
+
+def checkpoint_path_for(output_path: str) -> str:
+    """
+    Default checkpoint journal of a run, stored next to its output file.
+    """
+    return output_path + ".checkpoint"
+
+
+class CheckpointJournal:
+    """
+    Local state file of an extraction run, so an interrupted or crashed batch can be resumed.
+
+    Two things are journaled: the result of every completed file, keyed by its content and the
+    page/section selection it was extracted with, and, when the page cache is disabled, the pages
+    decoded so far of the file being extracted, committed every CHECKPOINT_PAGES pages (with the
+    cache, its staged pages are the checkpoint, so pages are not written twice). Batch workers each
+    open their own journal on the same file.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        # Batch workers write to the same journal; WAL lets them commit without blocking readers
+        self.conn = sqlite3.connect(path, timeout=60)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.executescript(SCHEMA)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def close(self) -> None:
+        self.conn.close()
+
+    def completed_result(self, run_key: str) -> dict:
+        """
+        Returns the journaled result of a completed file, or None.
+        """
+        row = self.conn.execute("SELECT result FROM results WHERE run_key = ?", (run_key,)).fetchone()
+        return pickle.loads(zlib.decompress(row[0])) if row else None
+
+    def record_result(self, run_key: str, pdf_path: str, result: dict) -> None:
+        """
+        Journals a completed file and drops its page checkpoints, which are no longer needed.
+        """
+        blob = zlib.compress(pickle.dumps(result, protocol=pickle.HIGHEST_PROTOCOL))
+        doc_key = run_key.split("|", 1)[0]
+        with self.conn:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (run_key, pdf_path, result) VALUES (?, ?, ?)", (run_key, pdf_path, blob)
+            )
+            self.conn.execute("DELETE FROM pages WHERE doc_key = ?", (doc_key,))
+
+    def journaled_page_numbers(self, doc_key: str) -> list:
+        """
+        Returns the numbers of the pages checkpointed for a document, in page order.
+        """
+        rows = self.conn.execute("SELECT page_number FROM pages WHERE doc_key = ? ORDER BY page_number", (doc_key,))
+        return [page_number for (page_number,) in rows]
+
+    def journaled_pages(self, doc_key: str, page_numbers: list):
+        """
+        Yields the (page_number, text) pairs of checkpointed pages (from journaled_page_numbers),
+        reading CHECKPOINT_PAGES pages at a time. Only the given pages are read, so pages
+        checkpointed meanwhile by the same run are not read back.
+        """
+        for index in range(0, len(page_numbers), CHECKPOINT_PAGES):
+            batch = page_numbers[index:index + CHECKPOINT_PAGES]
+            rows = self.conn.execute(
+                f"SELECT page_number, text FROM pages WHERE doc_key = ? AND page_number IN ({', '.join('?' * len(batch))}) "
+                "ORDER BY page_number",
+                (doc_key, *batch),
+            ).fetchall()
+            for page_number, blob in rows:
+                yield page_number, zlib.decompress(blob).decode("utf-8")
+
+    def record_pages(self, doc_key: str, pages: list) -> None:
+        with self.conn:
+            self.conn.executemany(
+                "INSERT OR REPLACE INTO pages (doc_key, page_number, text) VALUES (?, ?, ?)",
+                [(doc_key, page_number, zlib.compress(text.encode("utf-8"))) for page_number, text in pages],
+            )
+
+    def iter_page_texts(self, pdf_path: str, doc_key: str, workers: int = 1):
+        """
+        Yields (page_number, text) for every page in the PDF, in page order. Pages checkpointed by
+        an earlier, interrupted run are read back from the journal; only the remaining pages are
+        decoded, and they are checkpointed every CHECKPOINT_PAGES pages as they stream past.
+        """
+        journaled = self.journaled_page_numbers(doc_key)
+        if not journaled:
+            yield from self._checkpointed(doc_key, iter_page_texts(pdf_path, workers))
+            return
+        stats.count("pages resumed", len(journaled))
+        done = set(journaled)
+        remaining = [page_number for page_number in range(page_count(pdf_path)) if page_number not in done]
+        decoded = self._checkpointed(doc_key, iter_page_texts(pdf_path, workers, page_numbers=remaining))
+        yield from heapq.merge(self.journaled_pages(doc_key, journaled), decoded)
+
+    def _checkpointed(self, doc_key: str, pages):
+        batch = []
+        for page in pages:
+            batch.append(page)
+            if len(batch) >= CHECKPOINT_PAGES:
+                self.record_pages(doc_key, batch)
+                batch = []
+            yield page
+        if batch:
+            self.record_pages(doc_key, batch)
+
+
+def reset_journal(path: str) -> None:
+    """
+    Deletes a checkpoint journal (and its SQLite WAL files), e.g. to start a fresh run or after
+    a run completed cleanly.
+    """
+    for suffix in ("", "-wal", "-shm"):
+        if os.path.exists(path + suffix):
+            os.remove(path + suffix)
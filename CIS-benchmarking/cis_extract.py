@@ -0,0 +1,433 @@
+"""
+Extracts CIS controls from one or more benchmark PDFs into a single consolidated output.
+
+Example:
+    python CIS-benchmarking/cis_extract.py CIS-benchmarking/documents -o CIS_Controls.xlsx
+    python CIS-benchmarking/cis_extract.py "benchmarks/**/*.pdf" --jobs 8 -o CIS_Controls.csv
+
+    # Change report against the previous release, then remember this one
+    python CIS-benchmarking/cis_extract.py CIS_IBM_AIX_7.1_Benchmark_v2.2.0.pdf --since fingerprints.json \
+        --save-fingerprints fingerprints.json -o CIS_AIX_Changes.xlsx
+
+    # Also generate (or incrementally refresh) an InSpec profile
+    python CIS-benchmarking/cis_extract.py CIS-benchmarking/documents --inspec cis-profile
+
+    # Refresh the full-text control index, then query it with control_index.py
+    python CIS-benchmarking/cis_extract.py CIS-benchmarking/documents --index
+
+    # Re-extract only section 3 (resolved from the outline or Table of Contents) or a page range
+    python CIS-benchmarking/cis_extract.py CIS_IBM_AIX_7.1_Benchmark_v2.1.0.pdf --sections 3 -o AIX_Section3.csv
+    python CIS-benchmarking/cis_extract.py CIS_IBM_AIX_7.1_Benchmark_v2.1.0.pdf --pages 40-60 -o AIX_Pages.csv
+
+    # Continue an interrupted or partly failed batch from its checkpoint journal
+    python CIS-benchmarking/cis_extract.py benchmarks --jobs 8 -o CIS_Controls.csv --resume
+
+    # Refresh an analyst workbook in place: changed columns are updated, new controls appended and
+    # user-added columns kept
+    python CIS-benchmarking/cis_extract.py CIS-benchmarking/documents -o CIS_Controls.xlsx --upsert
+
+    # Per-stage timings and counters, plus a cProfile dump of an in-process run
+    python CIS-benchmarking/cis_extract.py CIS-benchmarking/documents --stats --profile extract.prof
+"""
+import argparse
+import functools
+import glob
+import json
+import logging
+import os
+import re
+import sys
+import time
+from contextlib import closing, nullcontext
+
+from checkpoint import CheckpointJournal, checkpoint_path_for, reset_journal
+from cis_parser import control_row, index_outline, scan_pages
+from control_index import DEFAULT_INDEX_PATH, index_benchmark, open_index
+from control_diff import (
+    control_fingerprints, diff_controls, fingerprint_pages, hash_pages, load_fingerprints, save_fingerprints,
+)
+from control_store import ControlBodyStore
+from inspec_profile import write_profile
+from instrumentation import Stats, profiled, stats
+from output_sinks import SINKS, open_sink
+from page_cache import DEFAULT_CACHE_PATH, document_info, document_key, iter_cached_page_texts
+from page_selection import parse_page_ranges, select_pages
+from workbook_upsert import UpsertSink
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Benchmark file naming convention (e.g., "CIS_IBM_AIX_7.1_Benchmark_v2.1.0_ARCHIVE.pdf")
+BENCHMARK_NAME_PATTERN = re.compile(r"^CIS_(.+?)_Benchmark_(v\d+(?:\.\d+)*)", re.IGNORECASE)
+
+
+def parse_benchmark_name(pdf_path: str) -> tuple:
+    """
+    Returns (benchmark, version) from a CIS benchmark file name,
+    e.g. ("IBM AIX 7.1", "v2.1.0"). Unrecognised names fall back to (file stem, "Unknown").
+    """
+    stem = os.path.splitext(os.path.basename(pdf_path))[0]
+    name_match = BENCHMARK_NAME_PATTERN.match(stem)
+    if not name_match:
+        return stem, "Unknown"
+    return name_match.group(1).replace("_", " "), name_match.group(2)
+
+
+def find_pdfs(inputs: list) -> list:
+    """
+    Expands directories (searched recursively), glob patterns and file paths into a sorted list of
+    unique PDF paths.
+    """
+    pdf_paths = set()
+    for item in inputs:
+        if os.path.isdir(item):
+            matches = glob.glob(os.path.join(item, "**", "*.pdf"), recursive=True)
+        else:
+            matches = glob.glob(item, recursive=True)
+        pdf_paths.update(os.path.abspath(path) for path in matches if path.lower().endswith(".pdf"))
+    return sorted(pdf_paths)
+
+
+# Control fields kept per benchmark in the fingerprint store
+STORED_FIELDS = ("control_number", "control_name", "automation_status", "category", "profile", "page", "fingerprint")
+
+
+def scan_benchmark(pdf_path: str, workers: int = 1, cache_path: str = DEFAULT_CACHE_PATH,
+                   page_spec: str = None, sections: list = None, journal: CheckpointJournal = None,
+                   doc_key: str = None) -> dict:
+    """
+    Scans one benchmark PDF and returns the scanner results, with a "fingerprint" of its page text
+    attached to every control and the body fields collected in scan["bodies"].
+
+    With page_spec (e.g. "40-60,75") or sections (e.g. ["3", "4.2"]) only the selected pages, the
+    pages their last controls continue onto and the Table of Contents are decoded, and only
+    controls starting on a selected page are returned.
+    With a checkpoint journal, a full decode resumes after the pages checkpointed by an earlier run.
+    doc_key is the PDF's document_key when the caller already has it.
+    """
+    # The file is hashed once here and the key passed to every cache and journal lookup
+    if doc_key is None and (cache_path is not None or journal is not None):
+        doc_key = document_key(pdf_path)
+
+    # Index control pages from the PDF outline; the TOC regex is only used when the PDF has none
+    info = document_info(pdf_path, cache_path, doc_key)
+    outline = index_outline(info["outline"])
+
+    selection = select_pages(pdf_path, page_spec, sections, cache_path, doc_key) if page_spec or sections else None
+    page_numbers = None
+    if selection is not None:
+        # A control cut off by the end of the selection is decoded up to its next heading, so its
+        # fingerprint and body match a full extraction
+        page_numbers = sorted(set(fingerprint_pages(selection["pages"], info["page_count"] - 1)) | set(selection["toc_pages"]))
+
+    # Stream page texts through the page hasher and the one-pass scanner, which attaches
+    # category, page and Profile Applicability to each de-duplicated control and collects the
+    # body fields into a compact store
+    page_hashes = {}
+    pages = hash_pages(
+        iter_cached_page_texts(pdf_path, workers=workers, cache_path=cache_path, page_numbers=page_numbers, journal=journal, doc_key=doc_key),
+        page_hashes,
+    )
+    scan = scan_pages(pages, outline=outline, body_store=ControlBodyStore())
+    if selection is not None:
+        selected = set(selection["pages"])
+        scan["controls"] = [control for control in scan["controls"] if control["page"] in selected]
+
+    with stats.span("fingerprint"):
+        fingerprints = control_fingerprints(scan, page_hashes)
+    for control in scan["controls"]:
+        control["fingerprint"] = fingerprints.get(control["control_number"])
+    return scan
+
+
+def output_row(control: dict, bodies: ControlBodyStore = None) -> dict:
+    """
+    Builds the output row for one control, with its body fields appended when bodies is given.
+    """
+    row = control_row(control)
+    row["Profile Applicability"] = control["profile"]
+    if bodies is not None:
+        row.update(bodies.fields(control["control_number"]))
+    return row
+
+
+def extract_controls(pdf_path: str, workers: int = 1, cache_path: str = DEFAULT_CACHE_PATH) -> list:
+    """
+    Extracts the controls of one benchmark PDF as output rows.
+    """
+    return [output_row(control) for control in scan_benchmark(pdf_path, workers, cache_path)["controls"]]
+
+
+def run_key(pdf_path: str, page_spec: str = None, sections: list = None, doc_key: str = None) -> str:
+    """
+    Checkpoint key of one file's extraction: its content (doc_key, or the file's document_key)
+    plus the page/section selection.
+    """
+    return f"{doc_key or document_key(pdf_path)}|{json.dumps([page_spec, sections])}"
+
+
+def _extract_benchmark(pdf_path: str, cache_path: str, page_spec: str = None, sections: list = None,
+                       checkpoint_path: str = None) -> tuple:
+    """
+    Worker: scans one benchmark and returns its Benchmark/Version, controls keyed by number, body
+    store and the stage timings/counters recorded while scanning it. With a checkpoint journal,
+    decoded pages are checkpointed while scanning and the result is journaled once complete.
+    """
+    stats.reset()
+    start = time.perf_counter()
+    benchmark, version = parse_benchmark_name(pdf_path)
+    journal = CheckpointJournal(checkpoint_path) if checkpoint_path else None
+    doc_key = document_key(pdf_path) if cache_path is not None or journal is not None else None
+    try:
+        scan = scan_benchmark(pdf_path, cache_path=cache_path, page_spec=page_spec, sections=sections, journal=journal, doc_key=doc_key)
+    finally:
+        if journal is not None:
+            journal.close()
+    controls = {
+        control["control_number"]: {field: control[field] for field in STORED_FIELDS}
+        for control in scan["controls"]
+    }
+    result = {
+        "benchmark": benchmark,
+        "version": version,
+        "file": pdf_path,
+        "controls": controls,
+        "bodies": scan["bodies"],
+        "stats": stats.as_dict(),
+        "partial": bool(page_spec or sections)
+    }
+    if checkpoint_path:
+        with CheckpointJournal(checkpoint_path) as journal:
+            journal.record_result(run_key(pdf_path, page_spec, sections, doc_key), pdf_path, result)
+    return result, time.perf_counter() - start
+
+
+def iter_batch(pdf_paths: list, report: list, jobs: int = None, cache_path: str = DEFAULT_CACHE_PATH,
+               page_spec: str = None, sections: list = None, checkpoint_path: str = None, resume: bool = False):
+    """
+    Extracts every PDF concurrently, one file per worker process, and yields each result in input
+    order as soon as it and all earlier files are done, so output can be written while later files
+    are still being extracted. With jobs=1, or a single file to extract, the files are extracted
+    one by one in this process (e.g. so a profiler sees the extraction). page_spec and sections select the pages of every
+    file (see scan_benchmark).
+
+    With checkpoint_path, progress is journaled to that file; with resume, files completed by an
+    earlier run are read back from it instead of being extracted again (reported as "resumed"),
+    and a file that was interrupted continues after its last checkpointed page.
+
+    Yields:
+    - {"benchmark", "version", "file", "controls", "bodies", "stats", "partial"} for every file
+      extracted successfully. One entry per file ("file", "status", "controls", "seconds", "error") is
+      appended to report.
+    """
+    resumed = {}
+    if resume and checkpoint_path:
+        with CheckpointJournal(checkpoint_path) as journal:
+            for pdf_path in pdf_paths:
+                result = journal.completed_result(run_key(pdf_path, page_spec, sections))
+                if result is not None:
+                    resumed[pdf_path] = result
+
+    # A single file is extracted in-process: a worker pool would only add its start-up time
+    if len(pdf_paths) - len(resumed) <= 1:
+        jobs = 1
+    pool_context = nullcontext()
+    if jobs != 1:
+        from concurrent.futures import ProcessPoolExecutor
+
+        pool_context = ProcessPoolExecutor(max_workers=jobs)
+
+    with pool_context as pool:
+        outcomes = {}
+        for pdf_path in pdf_paths:
+            if pdf_path in resumed:
+                continue
+            arguments = (pdf_path, cache_path, page_spec, sections, checkpoint_path)
+            if pool is None:
+                outcomes[pdf_path] = functools.partial(_extract_benchmark, *arguments)
+            else:
+                outcomes[pdf_path] = pool.submit(_extract_benchmark, *arguments).result
+        for pdf_path in pdf_paths:
+            if pdf_path in resumed:
+                result = resumed[pdf_path]
+                result["stats"] = {"timings": {}, "counters": {"files resumed": 1}}
+                logging.info(f"Resumed {len(result['controls'])} controls of {os.path.basename(pdf_path)} from the checkpoint")
+                report.append({"file": pdf_path, "status": "resumed", "controls": len(result["controls"]), "seconds": None, "error": None})
+                yield result
+                continue
+            try:
+                result, seconds = outcomes[pdf_path]()
+            except Exception as e:
+                logging.error(f"Failed to extract {pdf_path}: {e}")
+                report.append({"file": pdf_path, "status": "failed", "controls": 0, "seconds": None, "error": str(e)})
+                continue
+            control_count = len(result["controls"])
+            logging.info(f"Extracted {control_count} controls from {os.path.basename(pdf_path)} in {seconds:.2f}s")
+            report.append({"file": pdf_path, "status": "ok", "controls": control_count, "seconds": seconds, "error": None})
+            yield result
+
+
+def benchmark_rows(result: dict, with_bodies: bool = False) -> list:
+    """
+    Output rows for every control of one extracted benchmark.
+    """
+    bodies = result["bodies"] if with_bodies else None
+    return [
+        {"Benchmark": result["benchmark"], "Version": result["version"], **output_row(control, bodies)}
+        for control in result["controls"].values()
+    ]
+
+
+def change_rows(result: dict, previous: dict, with_bodies: bool = False) -> list:
+    """
+    Output rows for the controls added, removed or changed since the previous stored extraction of
+    the same benchmark. Unchanged controls are skipped without building their rows. Controls outside
+    a page or section selection are not reported as removed.
+    """
+    previous_controls = previous.get("controls", {})
+    bodies = result["bodies"] if with_bodies else None
+    rows = []
+    for change, control_number in diff_controls(previous_controls, result["controls"]):
+        if change == "Removed" and result.get("partial"):
+            continue
+        control = result["controls"].get(control_number) or previous_controls[control_number]
+        rows.append({
+            "Benchmark": result["benchmark"],
+            "Version": result["version"],
+            "Previous Version": previous.get("version"),
+            "Change": change,
+            **output_row(control, bodies)
+        })
+    return rows
+
+
+def print_report(report: list) -> None:
+    print(f"\n{'Status':<8} {'Controls':>8} {'Seconds':>8}  File")
+    for entry in report:
+        seconds = f"{entry['seconds']:.2f}" if entry["seconds"] is not None else "-"
+        print(f"{entry['status']:<8} {entry['controls']:>8} {seconds:>8}  {os.path.basename(entry['file'])}")
+        if entry["error"]:
+            print(f"{'':<27} {entry['error']}")
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Extract CIS controls from benchmark PDFs.")
+    parser.add_argument("inputs", nargs="+", help="Benchmark PDFs, directories or glob patterns")
+    parser.add_argument("-o", "--output", default="CIS_Controls.xlsx", help="Consolidated output file (.xlsx, .csv, .jsonl or .parquet)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Files processed in parallel (default: one per CPU)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse PDFs instead of using the page text cache")
+    parser.add_argument("--pages", metavar="SPEC", help="Only extract controls on these pages, numbered as in the Page column (e.g. 40-60,75,300-)")
+    parser.add_argument("--sections", metavar="LIST", type=lambda value: [s.strip() for s in value.split(",") if s.strip()], help="Only extract these sections, comma-separated (e.g. 3 or 3.1,4.2)")
+    parser.add_argument("--upsert", action="store_true", help="Merge into an existing .xlsx output by control number, keeping user-added columns")
+    parser.add_argument("--bodies", action="store_true", help="Add Description, Rationale, Audit, Remediation, Default Value and References columns")
+    parser.add_argument("--since", metavar="STORE", help="Write only controls added, removed or changed since this fingerprint store")
+    parser.add_argument("--save-fingerprints", metavar="STORE", help="Save control fingerprints for later --since runs")
+    parser.add_argument("--inspec", metavar="DIR", help="Generate an InSpec profile of all extracted controls in this directory")
+    parser.add_argument("--inspec-name", help="InSpec profile name (default: derived from the benchmark)")
+    parser.add_argument("--index", nargs="?", const=DEFAULT_INDEX_PATH, metavar="PATH", help="Add the extracted controls to a full-text search index (see control_index.py)")
+    parser.add_argument("--resume", action="store_true", help="Continue from the checkpoint journal of an interrupted or failed run")
+    parser.add_argument("--checkpoint", metavar="PATH", help="Checkpoint journal (default: <output>.checkpoint, removed after a clean run)")
+    parser.add_argument("--stats", nargs="?", const="table", choices=["table", "json"], help="Print stage timings and counters as a table (default) or JSON")
+    parser.add_argument("--profile", metavar="PATH", help="Profile the run into a cProfile dump, or an HTML report for .html paths (pyinstrument); implies --jobs 1")
+    args = parser.parse_args(argv)
+
+    if os.path.splitext(args.output)[1].lower() not in SINKS:
+        parser.error(f"unsupported output format '{args.output}' (use one of: {', '.join(SINKS)})")
+    if args.upsert and os.path.splitext(args.output)[1].lower() != ".xlsx":
+        parser.error("--upsert requires an .xlsx output")
+    if args.pages:
+        try:
+            parse_page_ranges(args.pages)
+        except ValueError as e:
+            parser.error(str(e))
+
+    pdf_paths = find_pdfs(args.inputs)
+    if not pdf_paths:
+        logging.error("No benchmark PDFs found.")
+        return 1
+
+    if args.profile and args.jobs != 1:
+        logging.info("Profiling: extracting files in-process (--jobs 1).")
+        args.jobs = 1
+
+    cache_path = None if args.no_cache else DEFAULT_CACHE_PATH
+    checkpoint_path = args.checkpoint or checkpoint_path_for(args.output)
+    if not args.resume:
+        reset_journal(checkpoint_path)
+    previous_store = load_fingerprints(args.since) if args.since else None
+    store = load_fingerprints(args.save_fingerprints) if args.save_fingerprints else None
+
+    report = []
+    profile_results = []
+    run_stats = Stats()
+    start = time.perf_counter()
+    index = closing(open_index(args.index)) if args.index else nullcontext()
+    sink = UpsertSink(args.output) if args.upsert else open_sink(args.output)
+    with profiled(args.profile), sink, index as index_conn:
+        for result in iter_batch(pdf_paths, report, jobs=args.jobs, cache_path=cache_path, page_spec=args.pages,
+                                 sections=args.sections, checkpoint_path=checkpoint_path, resume=args.resume):
+            run_stats.merge(result.pop("stats"))
+            if previous_store is not None:
+                # Change report: compare the benchmark against its previously stored version
+                rows = change_rows(result, previous_store.get(result["benchmark"], {}), with_bodies=args.bodies)
+            else:
+                rows = benchmark_rows(result, with_bodies=args.bodies)
+            with run_stats.span("write"):
+                for row in rows:
+                    sink.write(row)
+            if index_conn is not None:
+                with run_stats.span("index"):
+                    index_benchmark(index_conn, result)
+            if args.inspec:
+                profile_results.append(result)
+            if store is not None:
+                controls = result["controls"]
+                if result["partial"] and store.get(result["benchmark"], {}).get("version") == result["version"]:
+                    # A page or section selection only refreshes the controls it extracted
+                    controls = {**store[result["benchmark"]]["controls"], **controls}
+                store[result["benchmark"]] = {"version": result["version"], "file": result["file"], "controls": controls}
+        with run_stats.span("write"):
+            sink.close()
+    run_stats.count("rows written", sink.rows_written)
+    run_stats.add_time("total", time.perf_counter() - start)
+    if args.stats != "json":
+        print_report(report)
+
+    profile_failed = False
+    if args.inspec and profile_results:
+        partial = any(result["partial"] for result in profile_results)
+        try:
+            counts = write_profile(args.inspec, profile_results, name=args.inspec_name, jobs=args.jobs, prune=not partial)
+            logging.info(
+                f"InSpec profile '{args.inspec}': {counts['written']} file(s) written, "
+                f"{counts['unchanged']} unchanged, {counts['removed']} removed."
+            )
+        except ValueError as e:
+            logging.error(f"InSpec profile '{args.inspec}' not written: {e}")
+            profile_failed = True
+
+    if store is not None:
+        save_fingerprints(args.save_fingerprints, store)
+        logging.info(f"Saved control fingerprints to '{args.save_fingerprints}'.")
+
+    if args.stats == "table":
+        print("\n" + run_stats.format_table())
+    elif args.stats == "json":
+        print(json.dumps({**run_stats.as_dict(), "files": report}, indent=2))
+
+    if args.since and not sink.rows_written:
+        logging.info(f"No controls added, removed or changed since '{args.since}'.")
+    elif sink.rows_written:
+        extracted = sum(1 for entry in report if entry["status"] != "failed")
+        logging.info(f"Saved {sink.rows_written} controls from {extracted} benchmark(s) to '{args.output}'.")
+    if any(entry["status"] == "failed" for entry in report):
+        logging.info(f"Progress is saved in '{checkpoint_path}'; re-run with --resume to retry the failed files.")
+        return 1
+    if profile_failed:
+        return 1
+    reset_journal(checkpoint_path)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
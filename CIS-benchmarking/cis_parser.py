@@ -0,0 +1,246 @@
+import re
+import time
+
+from instrumentation import stats
+
+# Regex pattern for the running page header printed at the top of every page (e.g., "Page 42")
+PAGE_HEADER_PATTERN = re.compile(r"^Page \d+$")
+
+# Regex pattern for Table of Contents (TOC) lines with dot leaders (e.g., "3.1.1.1 Disable writesrv (Automated) ..... 42")
+TOC_LINE_PATTERN = re.compile(r"^(\d+(?:\.\d+)*)\s+(.*?)\s*(?:\.{2,}\s*(\d*)|\.\s*(\d+))$")
+
+# Regex pattern for a numbered heading line (e.g., "2 Data Protection", "3.1.1.1 Disable writesrv (Automated)")
+HEADING_PATTERN = re.compile(r"^(\d+(?:\.\d+)*)\s+(.*)$")
+
+# Regex pattern for the automation status that ends a control title (e.g., "Disable writesrv (Automated)")
+STATUS_PATTERN = re.compile(r"^(.*?)\s*\((Automated|Manual)\)$")
+
+# Regex pattern for profile levels listed under "Profile Applicability:" (e.g., "•  Level 1")
+PROFILE_LEVEL_PATTERN = re.compile(r"(Level \d)")
+
+# Regex pattern to split a PDF outline title into section or control number and title (e.g., "3 Network", "3.1.1.1 Disable writesrv (Automated)")
+OUTLINE_TITLE_PATTERN = re.compile(r"^(\d+(?:\.\d+)*)\s+(.+?)\s*$")
+
+# Lines read for one body heading, as long titles wrap (e.g., "3.4.6 ... 900 seconds (or" / "less) (Manual)")
+MAX_HEADING_LINES = 3
+
+
+def index_outline(outline: list) -> list:
+    """
+    Builds the control index from a PDF outline (as returned by read_outline).
+
+    Returns:
+    - A list of {"control_number", "title", "level", "page"} dicts for every numbered outline
+      entry (sections and controls, in outline order), with level the outline depth and page
+      converted to the 0-based page number used by the page matchers.
+    """
+    entries = []
+    for level, title, page in outline:
+        title_match = OUTLINE_TITLE_PATTERN.match(title.strip())
+        if title_match and page > 0:
+            entries.append({
+                "control_number": title_match.group(1),
+                "title": title_match.group(2),
+                "level": level,
+                "page": page - 1
+            })
+    return entries
+
+
+def is_control_number(number: str) -> bool:
+    # Controls are numbered 2 to 4 levels deep (e.g., "2.1" to "3.1.1.1")
+    return 1 <= number.count(".") <= 3
+
+
+class ControlScanner:
+    """
+    Single-pass line scanner for CIS benchmark text.
+
+    Pages are fed in order and every line is classified once: TOC entry, section header, control
+    heading or Profile Applicability line. TOC entries and body headings for the same control are
+    merged into one record, so each control is emitted exactly once. When the PDF has an outline,
+    the section and control records are seeded from it (title, outline level and page) and TOC
+    lines are not classified at all.
+
+    Body headings are only recognised on the first line of a page (CIS starts every
+    recommendation on a new page), which keeps the appendix tables and in-text references to CIS
+    Controls from being read as controls. When a ControlBodyStore is given, the lines following a
+    control heading are routed into it until the next page that opens with a heading or appendix.
+    """
+
+    def __init__(self, outline: list = None, body_store=None):
+        self.body_store = body_store
+        self.categories = {}
+        self.toc = []
+        self.controls = {}
+        self.boundaries = set()
+        self.current_control = None
+        self.in_profile = False
+        # Regex matches by kind, reported to the stats recorder by scan_pages
+        self.matches = {"toc matches": 0, "heading matches": 0, "profile matches": 0}
+        # The TOC regex is only needed when the PDF has no outline to index controls from
+        self.read_toc_lines = not outline
+        for entry in outline or ():
+            self._toc_entry(entry["control_number"], entry["title"], entry["page"], entry["level"])
+
+    def _control(self, control_number: str, control_name: str, automation_status: str) -> dict:
+        control = self.controls.get(control_number)
+        if control is None:
+            control = self.controls[control_number] = {
+                "control_number": control_number,
+                "control_name": control_name,
+                "automation_status": automation_status,
+                "profile": "Unknown",
+                "page": None,
+                "toc_page": None,
+                "outline_level": None
+            }
+        return control
+
+    def _toc_entry(self, number: str, title: str, page_number: int, level: int = None) -> None:
+        # TOC line or outline entry (level is the outline depth, None for TOC lines)
+        self.toc.append({"control_number": number, "title": title, "page": page_number})
+        if "." not in number:
+            self.categories.setdefault(number, title)
+            return
+        status_match = STATUS_PATTERN.match(title)
+        if status_match and is_control_number(number):
+            control = self._control(number, status_match.group(1), status_match.group(2))
+            if control["toc_page"] is None:
+                control["toc_page"] = page_number
+                control["outline_level"] = level
+
+    def _heading(self, page_number: int, lines: list) -> None:
+        self.current_control = None
+        if self.body_store is not None:
+            self.body_store.end_control()
+        heading_match = HEADING_PATTERN.match(lines[0])
+        if not heading_match:
+            return
+        number, title = heading_match.groups()
+        if "." not in number:
+            self.categories.setdefault(number, title)
+            return
+
+        # Join wrapped title lines until the automation status closes the heading
+        status_match = STATUS_PATTERN.match(title)
+        extra = 1
+        while not status_match and extra < min(len(lines), MAX_HEADING_LINES):
+            if lines[extra].startswith("Profile Applicability"):
+                break
+            title = f"{title} {lines[extra]}"
+            status_match = STATUS_PATTERN.match(title)
+            extra += 1
+
+        if status_match and is_control_number(number):
+            self.current_control = self._control(number, status_match.group(1), status_match.group(2))
+            self.current_control["page"] = page_number
+            if self.body_store is not None:
+                self.body_store.start_control(number, page_number)
+
+    def feed(self, page_number: int, page_text: str) -> None:
+        lines = [line.strip() for line in page_text.splitlines()]
+        lines = [line for line in lines if line and not PAGE_HEADER_PATTERN.match(line)]
+        self.in_profile = False
+
+        for index, line in enumerate(lines):
+            # TOC entries only appear outside control bodies
+            toc_match = TOC_LINE_PATTERN.match(line) if self.read_toc_lines and self.current_control is None else None
+            if toc_match:
+                number, title, page, page_after_single_dot = toc_match.groups()
+                page = page or page_after_single_dot
+                self._toc_entry(number, title, int(page) if page else None)
+                self.matches["toc matches"] += 1
+                continue
+
+            # Pages opening with a heading or an appendix start a new body block; any other page
+            # continues the body of the current control
+            if index == 0 and (HEADING_PATTERN.match(line) or line.startswith("Appendix")):
+                self.boundaries.add(page_number)
+                self._heading(page_number, lines)
+                self.matches["heading matches"] += 1
+                continue
+
+            if self.body_store is not None:
+                self.body_store.add_line(page_number, line)
+
+            if line.startswith("Profile Applicability"):
+                self.in_profile = True
+                continue
+
+            if self.in_profile:
+                level_match = PROFILE_LEVEL_PATTERN.search(line)
+                if level_match:
+                    self.matches["profile matches"] += 1
+                    # Keep the first level listed, as shown in the benchmark's summary tables
+                    if self.current_control and self.current_control["profile"] == "Unknown":
+                        self.current_control["profile"] = level_match.group(1)
+                elif line != "•":
+                    self.in_profile = False
+
+    def results(self) -> dict:
+        """
+        Returns:
+        - A dictionary with "controls" (de-duplicated control records in document order, each with
+          category, automation status, profile and page), "categories" ({section_number: name}),
+          "toc" (every TOC line or outline entry as {"control_number", "title", "page"}), "boundaries" (sorted
+          pages on which a heading or appendix starts) and "bodies" (the ControlBodyStore, or None).
+        """
+        if self.body_store is not None:
+            self.body_store.freeze()
+        controls = []
+        for control in self.controls.values():
+            control_number = control["control_number"]
+            if control["page"] is None:
+                control["page"] = control["toc_page"]
+            # Determine category based on the first number in the control (e.g., "2.1.1.1" -> "2" -> "Data Protection")
+            control["category"] = self.categories.get(control_number.split(".")[0], "Unknown")
+            controls.append(control)
+        return {
+            "controls": controls,
+            "categories": self.categories,
+            "toc": self.toc,
+            "boundaries": sorted(self.boundaries),
+            "bodies": self.body_store
+        }
+
+
+def scan_pages(pages, outline: list = None, body_store=None) -> dict:
+    """
+    Feeds a stream of (page_number, text) pairs through a ControlScanner in one pass. Each page is
+    discarded once scanned, so memory does not grow with the PDF length.
+
+    Parameters:
+    - pages: Iterable of (page_number, text), e.g. from iter_page_texts.
+    - outline: Optional outline entries from index_outline. Controls and sections are seeded
+      from them, their pages are used for controls whose body heading was not found, and TOC
+      lines are not scanned for.
+    - body_store: Optional ControlBodyStore that receives each control's body fields.
+    """
+    scanner = ControlScanner(outline, body_store)
+    for page_number, page_text in pages:
+        start = time.perf_counter()
+        scanner.feed(page_number, page_text)
+        stats.add_time("scan", time.perf_counter() - start)
+    for name, n in scanner.matches.items():
+        stats.count(name, n)
+    return scanner.results()
+
+
+def control_row(control: dict) -> dict:
+    """
+    Builds the output row for one extracted control.
+    """
+    control_number = control["control_number"]
+    control_name = control["control_name"]
+
+    # Format Inspec Profile Control Name (replace spaces with underscores but keep dashes)
+    formatted_name = control_number + "_" + control_name.replace(" ", "_")
+
+    return {
+        "Category": control["category"],
+        "Control Name": control_name,
+        "Automated/Manual": control["automation_status"],
+        "Inspec Profile Control Name": formatted_name,
+        "Page": control["page"]
+    }
@@ -0,0 +1,325 @@
+"""
+Evaluates the automatable controls of a CIS benchmark against collected host configuration snapshots.
+
+Each host is a folder under the snapshot directory holding copies of its configuration files at
+their system paths, plus the output of configuration commands:
+
+    snapshots/<host>/etc/security/user        (also login.cfg, limits: stanza files read by lssec)
+    snapshots/<host>/etc/inittab              (or lsitab.txt: output of "lsitab -a")
+    snapshots/<host>/etc/inetd.conf
+    snapshots/<host>/no-a.txt                 (output of "no -a")
+
+Example:
+    python CIS-benchmarking/compliance.py CIS-benchmarking/documents/CIS_IBM_AIX_7.1_Benchmark_v2.1.0_ARCHIVE.pdf \
+        snapshots -o compliance.xlsx --jobs 8
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from cis_extract import scan_benchmark
+from output_sinks import SINKS, open_sink
+from page_cache import DEFAULT_CACHE_PATH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Evaluation outcomes
+PASS, FAIL, NOT_APPLICABLE = "PASS", "FAIL", "N/A"
+
+# Snapshot files holding command output
+COMMAND_FILES = {"no": "no-a.txt", "lsitab": "lsitab.txt"}
+
+# Hosts evaluated per worker task
+HOST_CHUNK_SIZE = 32
+
+# Audit commands recognised in the control text
+LSSEC_PATTERN = re.compile(r"lssec -f (\S+) -s (\w+)((?: -a \w+)+)")
+LSITAB_PATTERN = re.compile(r"^lsitab (\w+)$", re.MULTILINE)
+NO_OPTION_PATTERN = re.compile(r"^no -o (\w+)$", re.MULTILINE)
+NO_GREP_PATTERN = re.compile(r'^no -a \|\s*grep "([^"]+)"$', re.MULTILINE)
+INETD_PIPELINE_PATTERN = re.compile(r"^lssrc -s inetd -l((?:\s*\|\s*grep (?:-v )?(?:\"[^\"]+\"|\S+))+)\s*\|\s*wc -l$", re.MULTILINE)
+INETD_COMMENTED_PATTERN = re.compile(r'^grep "\^#(\w+)\[\[:blank:\]\]" /etc/inetd\.conf$', re.MULTILINE)
+GREP_PATTERN = re.compile(r"grep (-v )?(\"[^\"]+\"|\S+)")
+
+# Direction in which a stanza attribute is "more restrictive" than the value the audit prints;
+# attributes not listed must match exactly
+ATTRIBUTE_COMPARISONS = {
+    "histexpire": ">=", "histsize": ">=", "logindelay": ">=", "minalpha": ">=", "mindiff": ">=",
+    "mindigit": ">=", "minlen": ">=", "minloweralpha": ">=", "minother": ">=", "minspecialchar": ">=",
+    "minupperalpha": ">=", "loginretries": "<=", "logintimeout": "<=", "maxage": "<=",
+    "maxexpired": "<=", "maxrepeats": "<=",
+}
+
+# Custom checks for controls whose audit cannot be compiled from the text: {control_number: function(snapshot) -> outcome}
+RULES = {}
+
+
+def rule(control_number: str):
+    """
+    Registers a custom check for a control, taking precedence over the rule compiled from its audit text.
+    """
+    def register(check):
+        RULES[control_number] = check
+        return check
+    return register
+
+
+def posix_regex(pattern: str) -> str:
+    return pattern.replace("[[:blank:]]", "[ \t]")
+
+
+def compile_rule(control_number: str, audit: str) -> tuple:
+    """
+    Compiles a control's audit procedure into a picklable rule tuple, or returns None when the
+    audit is not recognised (the control is then reported as N/A).
+    """
+    if control_number in RULES:
+        return ("custom", control_number)
+    lssec = LSSEC_PATTERN.findall(audit)
+    if lssec:
+        checks = []
+        for path, stanza, attributes in lssec:
+            for attribute in re.findall(r"-a (\w+)", attributes):
+                expected = re.search(rf"^{stanza} .*?\b{attribute}=(\S*)", audit, re.MULTILINE)
+                if expected is None:
+                    return None
+                checks.append((path, stanza, attribute, expected.group(1).strip('"')))
+        return ("lssec", tuple(checks))
+    inetd = INETD_PIPELINE_PATTERN.search(audit)
+    if inetd:
+        greps = tuple(
+            (bool(invert), posix_regex(pattern.strip('"'))) for invert, pattern in GREP_PATTERN.findall(inetd.group(1))
+        )
+        return ("inetd", greps)
+    commented = INETD_COMMENTED_PATTERN.search(audit)
+    if commented:
+        return ("inetd", ((False, rf"^{commented.group(1)}[ \t]"),))
+    no_grep = NO_GREP_PATTERN.search(audit)
+    if no_grep:
+        return ("no", posix_regex(no_grep.group(1)))
+    no_option = NO_OPTION_PATTERN.search(audit)
+    if no_option:
+        expected = re.search(rf"^{no_option.group(1)} = (\S+)", audit, re.MULTILINE)
+        if expected:
+            return ("no", rf"^\s*{no_option.group(1)}[ \t]=[ \t]{re.escape(expected.group(1))}\s*$")
+    lsitab = LSITAB_PATTERN.findall(audit)
+    if lsitab:
+        return ("lsitab", tuple(lsitab))
+    return None
+
+
+def compile_rules(controls: list, bodies) -> dict:
+    """
+    Returns {control_number: rule} for the automated controls whose audit can be evaluated.
+    """
+    rules = {}
+    for control in controls:
+        if control["automation_status"] != "Automated":
+            continue
+        compiled = compile_rule(control["control_number"], bodies.get(control["control_number"], "Audit"))
+        if compiled is not None:
+            rules[control["control_number"]] = compiled
+    return rules
+
+
+def read_stanzas(path: str) -> dict:
+    """
+    Parses an AIX stanza file (e.g. /etc/security/user) into {stanza: {attribute: value}}.
+    """
+    stanzas, current = {}, None
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        for line in f:
+            stripped = line.strip()
+            if not stripped or stripped.startswith("*"):
+                continue
+            if stripped.endswith(":") and not line[0].isspace():
+                current = stanzas.setdefault(stripped[:-1], {})
+            elif current is not None and "=" in stripped:
+                attribute, value = stripped.split("=", 1)
+                current[attribute.strip()] = value.strip().strip('"')
+    return stanzas
+
+
+def compare(attribute: str, actual: str, expected: str) -> bool:
+    if attribute == "umask":
+        # An octal umask is at least as restrictive when it masks every bit the expected one does
+        try:
+            return int(actual, 8) & int(expected, 8) == int(expected, 8)
+        except ValueError:
+            return False
+    comparison = ATTRIBUTE_COMPARISONS.get(attribute)
+    if comparison is None:
+        return actual == expected
+    try:
+        actual_number, expected_number = int(actual), int(expected)
+    except ValueError:
+        return actual == expected
+    if comparison == ">=":
+        return actual_number >= expected_number
+    # A limit of 0 means "unlimited" for these attributes, which is never more restrictive
+    return 0 < actual_number <= expected_number or actual_number == expected_number
+
+
+class HostSnapshot:
+    """
+    Lazily loaded configuration of one host; each file is read at most once.
+    """
+
+    def __init__(self, host_dir: str):
+        self.host_dir = host_dir
+        self.files = {}
+
+    def path(self, system_path: str) -> str:
+        return os.path.join(self.host_dir, *system_path.strip("/").split("/"))
+
+    def lines(self, name: str) -> list:
+        if name not in self.files:
+            path = self.path(name)
+            if os.path.exists(path):
+                with open(path, "r", encoding="utf-8", errors="replace") as f:
+                    self.files[name] = f.read().splitlines()
+            else:
+                self.files[name] = None
+        return self.files[name]
+
+    def stanzas(self, system_path: str) -> dict:
+        key = ("stanzas", system_path)
+        if key not in self.files:
+            path = self.path(system_path)
+            self.files[key] = read_stanzas(path) if os.path.exists(path) else None
+        return self.files[key]
+
+    def inittab(self) -> list:
+        lines = self.lines("/etc/inittab")
+        return lines if lines is not None else self.lines(COMMAND_FILES["lsitab"])
+
+
+@rule("3.1.2.1")
+def talk_and_write_disabled(snapshot: HostSnapshot) -> str:
+    # Audited with two commands: no talk service in inetd and no writesrv subsystem
+    inetd, inittab = snapshot.lines("/etc/inetd.conf"), snapshot.inittab()
+    if inetd is None or inittab is None:
+        return NOT_APPLICABLE
+    talk = any("talk" in line for line in inetd if line.strip() and not line.lstrip().startswith("#"))
+    writesrv = any(line.startswith("writesrv:") for line in inittab)
+    return FAIL if talk or writesrv else PASS
+
+
+def evaluate(rule_spec: tuple, snapshot: HostSnapshot) -> str:
+    kind = rule_spec[0]
+    if kind == "custom":
+        return RULES[rule_spec[1]](snapshot)
+    if kind == "lssec":
+        for path, stanza, attribute, expected in rule_spec[1]:
+            stanzas = snapshot.stanzas(path)
+            if stanzas is None:
+                return NOT_APPLICABLE
+            # Attributes not set on a stanza are inherited from the default stanza
+            actual = stanzas.get(stanza, {}).get(attribute, stanzas.get("default", {}).get(attribute, ""))
+            if not compare(attribute, actual, expected):
+                return FAIL
+        return PASS
+    if kind == "inetd":
+        lines = snapshot.lines("/etc/inetd.conf")
+        if lines is None:
+            return NOT_APPLICABLE
+        active = [line for line in lines if line.strip() and not line.lstrip().startswith("#")]
+        for invert, pattern in rule_spec[1]:
+            active = [line for line in active if bool(re.search(pattern, line)) != invert]
+        return FAIL if active else PASS
+    if kind == "no":
+        lines = snapshot.lines(COMMAND_FILES["no"])
+        if lines is None:
+            return NOT_APPLICABLE
+        return PASS if any(re.search(rule_spec[1], line) for line in lines) else FAIL
+    if kind == "lsitab":
+        lines = snapshot.inittab()
+        if lines is None:
+            return NOT_APPLICABLE
+        identifiers = {line.split(":", 1)[0].strip() for line in lines if ":" in line and not line.startswith(":")}
+        return FAIL if any(name in identifiers for name in rule_spec[1]) else PASS
+    raise ValueError(f"Unknown rule kind '{kind}'")
+
+
+def evaluate_host(host_dir: str, rules: dict) -> dict:
+    """
+    Evaluates every rule against one host snapshot folder.
+
+    Returns:
+    - {"Host", "Passed", "Failed", <control_number>: PASS/FAIL/N/A ...}
+    """
+    snapshot = HostSnapshot(host_dir)
+    outcomes = {control_number: evaluate(rule_spec, snapshot) for control_number, rule_spec in rules.items()}
+    return {
+        "Host": os.path.basename(host_dir),
+        "Passed": sum(1 for outcome in outcomes.values() if outcome == PASS),
+        "Failed": sum(1 for outcome in outcomes.values() if outcome == FAIL),
+        **outcomes
+    }
+
+
+def _evaluate_hosts(host_dirs: list, rules: dict) -> list:
+    """
+    Worker: evaluates a chunk of hosts.
+    """
+    return [evaluate_host(host_dir, rules) for host_dir in host_dirs]
+
+
+def iter_evaluations(host_dirs: list, rules: dict, jobs: int = None):
+    """
+    Evaluates hosts across a process pool in chunks of HOST_CHUNK_SIZE, yielding one result row
+    per host in input order.
+    """
+    chunks = [host_dirs[start:start + HOST_CHUNK_SIZE] for start in range(0, len(host_dirs), HOST_CHUNK_SIZE)]
+    if jobs == 1:
+        for chunk in chunks:
+            yield from _evaluate_hosts(chunk, rules)
+        return
+    with ProcessPoolExecutor(max_workers=jobs) as pool:
+        for rows in pool.map(_evaluate_hosts, chunks, [rules] * len(chunks)):
+            yield from rows
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Evaluate CIS controls against collected host snapshots.")
+    parser.add_argument("benchmark", help="Benchmark PDF whose controls are evaluated")
+    parser.add_argument("snapshots", help="Folder with one snapshot folder per host")
+    parser.add_argument("-o", "--output", default="CIS_Compliance.csv", help="Pass/fail matrix (.csv, .xlsx, .jsonl or .parquet)")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--list-rules", action="store_true", help="Print the compiled rule of every evaluable control and exit")
+    args = parser.parse_args(argv)
+
+    if os.path.splitext(args.output)[1].lower() not in SINKS:
+        parser.error(f"unsupported output format '{args.output}' (use one of: {', '.join(SINKS)})")
+
+    scan = scan_benchmark(args.benchmark, cache_path=DEFAULT_CACHE_PATH)
+    rules = compile_rules(scan["controls"], scan["bodies"])
+    automated = sum(1 for control in scan["controls"] if control["automation_status"] == "Automated")
+    logging.info(f"Compiled rules for {len(rules)} of {automated} automated controls.")
+    if args.list_rules:
+        for control_number, rule_spec in rules.items():
+            print(f"{control_number:<10} {rule_spec}")
+        return 0
+
+    host_dirs = sorted(
+        os.path.join(args.snapshots, name) for name in os.listdir(args.snapshots)
+        if os.path.isdir(os.path.join(args.snapshots, name))
+    )
+    if not host_dirs:
+        logging.error(f"No host snapshot folders found in '{args.snapshots}'.")
+        return 1
+
+    columns = ["Host", "Passed", "Failed", *rules]
+    with open_sink(args.output, columns) as sink:
+        for row in iter_evaluations(host_dirs, rules, jobs=args.jobs):
+            sink.write(row)
+    logging.info(f"Evaluated {len(rules)} controls on {sink.rows_written} hosts. Matrix saved to '{args.output}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
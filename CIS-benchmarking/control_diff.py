@@ -0,0 +1,104 @@
+import bisect
+import hashlib
+import json
+import os
+import time
+
+from cis_parser import PAGE_HEADER_PATTERN
+from instrumentation import stats
+
+# Upper bound on the pages fingerprinted for one control when no following heading is found
+MAX_CONTROL_PAGES = 10
+
+
+def page_hash(page_text: str) -> str:
+    """
+    Hashes a page's text with the running "Page N" header and layout whitespace removed, so a
+    control that only moved to a different page keeps the same fingerprint.
+    """
+    lines = [line.strip() for line in page_text.splitlines()]
+    content = "\n".join(line for line in lines if line and not PAGE_HEADER_PATTERN.match(line))
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def hash_pages(pages, page_hashes: dict):
+    """
+    Passes (page_number, text) pairs through unchanged while recording each page's hash into
+    page_hashes, so fingerprinting shares the single streaming pass over the PDF.
+    """
+    for page_number, page_text in pages:
+        start = time.perf_counter()
+        page_hashes[page_number] = page_hash(page_text)
+        stats.add_time("fingerprint", time.perf_counter() - start)
+        yield page_number, page_text
+
+
+def control_fingerprints(scan: dict, page_hashes: dict) -> dict:
+    """
+    Fingerprints every control from the hashes of the pages it spans: from its body page up to the
+    next page that opens with a heading or appendix.
+
+    Returns:
+    - {control_number: fingerprint}
+    """
+    boundaries = scan["boundaries"]
+    fingerprints = {}
+    for control in scan["controls"]:
+        start = control["page"]
+        if start is None:
+            continue
+        next_boundary = bisect.bisect_right(boundaries, start)
+        stop = boundaries[next_boundary] if next_boundary < len(boundaries) else start + MAX_CONTROL_PAGES
+        digest = hashlib.sha256(control["control_number"].encode("utf-8"))
+        for page_number in range(start, min(stop, start + MAX_CONTROL_PAGES)):
+            digest.update(page_hashes.get(page_number, "").encode("ascii"))
+        fingerprints[control["control_number"]] = digest.hexdigest()
+    return fingerprints
+
+
+def fingerprint_pages(pages: list, last_page: int) -> list:
+    """
+    Returns the selected pages plus the pages after each run of them that a control starting in
+    the run can continue onto, so the controls of a page selection are decoded up to their next
+    heading and fingerprinted exactly as in a full extraction.
+    """
+    spans = set(pages)
+    for page_number in pages:
+        if page_number + 1 not in spans:
+            spans.update(range(page_number + 1, min(page_number + MAX_CONTROL_PAGES, last_page + 1)))
+    return sorted(spans)
+
+
+def load_fingerprints(path: str) -> dict:
+    """
+    Loads a fingerprint store: {benchmark: {"version", "controls": {control_number: {...}}}}.
+    A missing file is treated as an empty store.
+    """
+    if not os.path.exists(path):
+        return {}
+    with open(path, "r", encoding="utf-8") as f:
+        return json.load(f)
+
+
+def save_fingerprints(path: str, store: dict) -> None:
+    with open(path, "w", encoding="utf-8") as f:
+        json.dump(store, f, indent=2, sort_keys=True)
+
+
+def diff_controls(previous: dict, current: dict) -> list:
+    """
+    Compares the stored controls of two versions of one benchmark, both shaped as
+    {control_number: {"fingerprint", "control_name", "automation_status", "profile", "page"}}.
+
+    Returns:
+    - A list of (change, control_number) tuples, change being "Added", "Removed" or "Changed",
+      in current document order followed by removed controls in previous document order.
+    """
+    changes = []
+    for control_number, control in current.items():
+        if control_number not in previous:
+            changes.append(("Added", control_number))
+        elif control["fingerprint"] != previous[control_number]["fingerprint"]:
+            changes.append(("Changed", control_number))
+    changes.extend(("Removed", control_number) for control_number in previous if control_number not in current)
+    return changes
@@ -0,0 +1,215 @@
+"""
+Full-text index over extracted CIS controls (SQLite FTS5).
+
+Build or refresh the index while extracting:
+    python CIS-benchmarking/cis_extract.py CIS-benchmarking/documents --index controls.sqlite
+
+Query it:
+    python CIS-benchmarking/control_index.py "/etc/security/user" --benchmark "IBM AIX 7.1"
+    python CIS-benchmarking/control_index.py network --level 2 --automation automated
+    python CIS-benchmarking/control_index.py --category "Access Control" --json
+"""
+import argparse
+import json
+import os
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+from control_store import BODY_FIELDS
+
+# Default location of the control index
+DEFAULT_INDEX_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "controls_index.sqlite")
+
+# Index column for each body field ("references" is an SQL keyword)
+BODY_COLUMNS = dict(zip(BODY_FIELDS, ("description", "rationale", "audit", "remediation", "default_value", "refs")))
+
+# Columns returned by search()
+RESULT_COLUMNS = ("benchmark", "version", "control_number", "control_name", "category", "level", "automation_status", "page")
+
+SCHEMA = f"""
+CREATE TABLE IF NOT EXISTS controls (
+    id INTEGER PRIMARY KEY,
+    benchmark TEXT NOT NULL,
+    version TEXT NOT NULL,
+    control_number TEXT NOT NULL,
+    control_name TEXT NOT NULL,
+    category TEXT,
+    level TEXT,
+    automation_status TEXT,
+    page INTEGER,
+    {", ".join(f"{column} TEXT" for column in BODY_COLUMNS.values())},
+    UNIQUE (benchmark, version, control_number)
+);
+CREATE INDEX IF NOT EXISTS controls_filters ON controls (level, automation_status);
+CREATE VIRTUAL TABLE IF NOT EXISTS controls_fts USING fts5(
+    control_number, control_name, {", ".join(BODY_COLUMNS.values())},
+    content='controls', content_rowid='id'
+);
+CREATE TRIGGER IF NOT EXISTS controls_ai AFTER INSERT ON controls BEGIN
+    INSERT INTO controls_fts (rowid, control_number, control_name, {", ".join(BODY_COLUMNS.values())})
+    VALUES (new.id, new.control_number, new.control_name, {", ".join(f"new.{column}" for column in BODY_COLUMNS.values())});
+END;
+CREATE TRIGGER IF NOT EXISTS controls_ad AFTER DELETE ON controls BEGIN
+    INSERT INTO controls_fts (controls_fts, rowid, control_number, control_name, {", ".join(BODY_COLUMNS.values())})
+    VALUES ('delete', old.id, old.control_number, old.control_name, {", ".join(f"old.{column}" for column in BODY_COLUMNS.values())});
+END;
+"""
+
+
+def _upgrade_schema(conn: sqlite3.Connection) -> None:
+    # Indexes built before versions were kept apart allowed one version per benchmark: copy their
+    # controls into the current table and rebuild the full-text index from it
+    row = conn.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'controls'").fetchone()
+    if row is None or "UNIQUE (benchmark, control_number)" not in row[0]:
+        return
+    conn.executescript(
+        "BEGIN; DROP TRIGGER controls_ai; DROP TRIGGER controls_ad; DROP INDEX controls_filters; "
+        "ALTER TABLE controls RENAME TO controls_previous;"
+        f"{SCHEMA}"
+        "INSERT INTO controls SELECT * FROM controls_previous; DROP TABLE controls_previous; "
+        "INSERT INTO controls_fts (controls_fts) VALUES ('rebuild'); COMMIT;"
+    )
+
+
+def open_index(index_path: str = DEFAULT_INDEX_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(index_path)), exist_ok=True)
+    conn = sqlite3.connect(index_path, timeout=60)
+    try:
+        _upgrade_schema(conn)
+        conn.executescript(SCHEMA)
+    except sqlite3.OperationalError as e:
+        conn.close()
+        if "fts5" in str(e):
+            raise RuntimeError("The control index requires an SQLite build with FTS5 support.") from e
+        raise
+    return conn
+
+
+def index_benchmark(conn: sqlite3.Connection, result: dict) -> int:
+    """
+    Replaces the indexed controls of one extracted benchmark version ({"benchmark", "version",
+    "controls", "bodies"}) in a single transaction; other versions of the benchmark are kept. For a partial extraction ("partial" set, e.g. from a page
+    or section selection) only the extracted controls are replaced. Returns the number of
+    controls indexed.
+    """
+    bodies = result.get("bodies")
+    rows = []
+    for control in result["controls"].values():
+        fields = bodies.fields(control["control_number"]) if bodies is not None else {}
+        rows.append((
+            result["benchmark"], result["version"], control["control_number"], control["control_name"],
+            control["category"], control["profile"], control["automation_status"], control["page"],
+            *(fields.get(field, "") for field in BODY_COLUMNS)
+        ))
+    with conn:
+        if result.get("partial"):
+            conn.executemany(
+                "DELETE FROM controls WHERE benchmark = ? AND version = ? AND control_number = ?",
+                [(result["benchmark"], result["version"], control_number) for control_number in result["controls"]],
+            )
+        else:
+            conn.execute("DELETE FROM controls WHERE benchmark = ? AND version = ?", (result["benchmark"], result["version"]))
+        conn.executemany(
+            f"INSERT INTO controls (benchmark, version, control_number, control_name, category, level, "
+            f"automation_status, page, {', '.join(BODY_COLUMNS.values())}) "
+            f"VALUES ({', '.join('?' * (8 + len(BODY_COLUMNS)))})",
+            rows,
+        )
+    return len(rows)
+
+
+def fts_query(text: str) -> str:
+    """
+    Turns free text into an FTS5 query matching every word, each quoted so that paths and
+    punctuation (e.g. "/etc/security/user") are searched literally rather than parsed as syntax.
+    """
+    return " ".join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+def search(conn: sqlite3.Connection, text: str = None, category: str = None, level: str = None,
+           automation: str = None, benchmark: str = None, limit: int = 50) -> list:
+    """
+    Searches the index. Every argument is optional and they combine with AND.
+
+    Parameters:
+    - text: Words to find in control numbers, titles and body fields (ranked by relevance).
+    - category: Case-insensitive substring of the category (e.g. "network").
+    - level: Profile level, as "2" or "Level 2".
+    - automation: "Automated" or "Manual" (case-insensitive).
+    - benchmark: Benchmark name (e.g. "IBM AIX 7.1"), case-insensitive.
+
+    Returns:
+    - A list of dicts with RESULT_COLUMNS, plus a "snippet" of the best matching text when
+      text is given.
+    """
+    columns = ", ".join(f"c.{column}" for column in RESULT_COLUMNS)
+    conditions, params = [], []
+    if text:
+        sql = f"SELECT {columns}, snippet(controls_fts, -1, '[', ']', '...', 10) FROM controls_fts JOIN controls c ON c.id = controls_fts.rowid"
+        conditions.append("controls_fts MATCH ?")
+        params.append(fts_query(text))
+    else:
+        sql = f"SELECT {columns}, NULL FROM controls c"
+    if category:
+        conditions.append("c.category LIKE ?")
+        params.append(f"%{category}%")
+    if level:
+        conditions.append("c.level = ?")
+        params.append(level if level.lower().startswith("level") else f"Level {level}")
+    if automation:
+        conditions.append("c.automation_status = ? COLLATE NOCASE")
+        params.append(automation)
+    if benchmark:
+        conditions.append("c.benchmark = ? COLLATE NOCASE")
+        params.append(benchmark)
+    if conditions:
+        sql += " WHERE " + " AND ".join(conditions)
+    sql += " ORDER BY bm25(controls_fts)" if text else " ORDER BY c.id"
+    sql += " LIMIT ?"
+    params.append(limit)
+
+    results = []
+    for row in conn.execute(sql, params):
+        entry = dict(zip(RESULT_COLUMNS, row))
+        if text:
+            entry["snippet"] = " ".join(row[-1].split())
+        results.append(entry)
+    return results
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Search the index of extracted CIS controls.")
+    parser.add_argument("text", nargs="?", help="Words to search for in titles and body fields")
+    parser.add_argument("--index", default=DEFAULT_INDEX_PATH, help="Index file built with cis_extract.py --index")
+    parser.add_argument("--category", help="Category contains this text")
+    parser.add_argument("--level", help="Profile level (1, 2 or 'Level 1')")
+    parser.add_argument("--automation", choices=["automated", "manual"], type=str.lower, help="Automated or Manual controls only")
+    parser.add_argument("--benchmark", help="Benchmark name (e.g. 'IBM AIX 7.1')")
+    parser.add_argument("--limit", type=int, default=50, help="Maximum results (default: 50)")
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args(argv)
+
+    if not os.path.exists(args.index):
+        parser.error(f"index '{args.index}' not found (build it with cis_extract.py --index)")
+
+    with closing(open_index(args.index)) as conn:
+        start = time.perf_counter()
+        results = search(conn, args.text, args.category, args.level, args.automation, args.benchmark, args.limit)
+        elapsed = time.perf_counter() - start
+
+    if args.json:
+        print(json.dumps(results, indent=2, ensure_ascii=False))
+        return 0
+    for entry in results:
+        print(f"{entry['benchmark']} {entry['version']}  {entry['control_number']:<10} {entry['level']:<8} "
+              f"{entry['automation_status']:<9} p.{entry['page']}  {entry['control_name']}")
+        if entry.get("snippet"):
+            print(f"    {entry['snippet']}")
+    print(f"\n{len(results)} control(s) in {elapsed * 1000:.2f} ms", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,242 @@
+"""
+Maps the controls of one CIS benchmark onto the controls of others (e.g. AIX 7.1 -> AIX 7.2, or
+AIX -> RHEL) by the similarity of their titles.
+
+Example:
+    python CIS-benchmarking/control_mapping.py CIS_IBM_AIX_7.1_Benchmark_v2.1.0.pdf CIS_IBM_AIX_7.2_Benchmark_v1.0.0.pdf
+    python CIS-benchmarking/control_mapping.py CIS_IBM_AIX_7.1_Benchmark_v2.1.0.pdf documents/ -k 5 --min-score 0.3 -o mapping.xlsx
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+
+import numpy as np
+from scipy import sparse
+
+from cis_extract import find_pdfs, parse_benchmark_name, scan_benchmark
+from output_sinks import SINKS, open_sink
+from page_cache import DEFAULT_CACHE_PATH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Character n-gram lengths vectorized from every title
+NGRAM_SIZES = (3, 4, 5)
+
+# Matches kept per source control by default
+TOP_K = 3
+
+# Source controls scored per sparse product, bounding the dense score block to ROW_CHUNK x targets
+ROW_CHUNK = 1024
+
+# Share of the score taken from the Description and Audit text with --bodies
+BODY_WEIGHT = 0.3
+
+# Characters other than letters and digits, collapsed to a single space before vectorizing
+NON_WORD_PATTERN = re.compile(r"[^a-z0-9]+")
+
+COLUMNS = [
+    "Source Benchmark", "Source Version", "Source Control", "Source Title", "Rank",
+    "Target Benchmark", "Target Version", "Target Control", "Target Title", "Score",
+]
+
+
+def normalize_text(text: str) -> str:
+    return NON_WORD_PATTERN.sub(" ", (text or "").lower()).strip()
+
+
+def char_ngrams(text: str, sizes: tuple = NGRAM_SIZES) -> list:
+    """
+    Returns the character n-grams of a normalized text, padded with a space on both sides so
+    word starts and ends get their own n-grams (e.g. " ssh", "sshd ").
+    """
+    padded = f" {text} "
+    return [padded[start:start + size] for size in sizes for start in range(len(padded) - size + 1)]
+
+
+def tfidf_vectors(texts: list) -> sparse.csr_matrix:
+    """
+    Builds one L2-normalized TF-IDF row of character n-grams per text.
+
+    All texts share one vocabulary and one set of IDF weights, so rows of different benchmarks
+    can be compared with a plain dot product. Term frequencies are sublinear (1 + log tf) so a
+    repeated word does not dominate a title.
+
+    Parameters:
+    - texts: Texts to vectorize (normalized with normalize_text).
+
+    Returns:
+    - A len(texts) x vocabulary sparse matrix whose row products are cosine similarities.
+    """
+    grams = [char_ngrams(normalize_text(text)) for text in texts]
+    lengths = np.fromiter((len(text_grams) for text_grams in grams), dtype=np.int64, count=len(grams))
+    if not lengths.sum():
+        return sparse.csr_matrix((len(texts), 0))
+
+    # Map every n-gram occurrence to a vocabulary column in one sort instead of a Python dict
+    vocabulary, columns = np.unique(np.array([gram for text_grams in grams for gram in text_grams]), return_inverse=True)
+    rows = np.repeat(np.arange(len(texts)), lengths)
+    counts = sparse.csr_matrix(
+        (np.ones(len(columns), dtype=np.float64), (rows, columns.ravel())), shape=(len(texts), len(vocabulary))
+    )
+    counts.sum_duplicates()
+
+    document_frequency = np.bincount(counts.indices, minlength=len(vocabulary))
+    idf = np.log((1 + len(texts)) / (1 + document_frequency)) + 1
+    counts.data = (1 + np.log(counts.data)) * idf[counts.indices]
+
+    norms = np.sqrt(np.asarray(counts.multiply(counts).sum(axis=1)).ravel())
+    norms[norms == 0] = 1
+    return sparse.diags(1 / norms) @ counts
+
+
+def top_matches(source_vectors: sparse.csr_matrix, target_vectors: sparse.csr_matrix, top_k: int = TOP_K,
+                min_score: float = 0.0, weights: list = None) -> list:
+    """
+    Finds the top_k most similar target rows of every source row.
+
+    Similarities are computed ROW_CHUNK source rows at a time as one sparse product against all
+    target rows, and the best columns of each block are picked with argpartition, so the cost is
+    a few matrix products rather than one comparison per control pair.
+
+    Parameters:
+    - source_vectors: Source vectors, or a list of source matrices (e.g. titles and bodies).
+    - target_vectors: Target vectors in the same vocabulary, or a list matching source_vectors.
+    - top_k: Matches kept per source row.
+    - min_score: Matches scoring below this are dropped.
+    - weights: Weight of each matrix pair when lists are given (default: equal weights).
+
+    Returns:
+    - One list of (target_row, score) per source row, best match first.
+    """
+    sources = source_vectors if isinstance(source_vectors, list) else [source_vectors]
+    targets = target_vectors if isinstance(target_vectors, list) else [target_vectors]
+    weights = weights or [1 / len(sources)] * len(sources)
+    source_count, target_count = sources[0].shape[0], targets[0].shape[0]
+    top_k = min(top_k, target_count)
+    transposed = [target.T.tocsc() for target in targets]
+
+    matches = []
+    for start in range(0, source_count, ROW_CHUNK):
+        stop = min(start + ROW_CHUNK, source_count)
+        block = np.zeros((stop - start, target_count))
+        for source, target_t, weight in zip(sources, transposed, weights):
+            block += weight * (source[start:stop] @ target_t).toarray()
+        if top_k == 0:
+            matches.extend([] for _ in range(stop - start))
+            continue
+        best = np.argpartition(-block, top_k - 1, axis=1)[:, :top_k]
+        best_scores = np.take_along_axis(block, best, axis=1)
+        order = np.argsort(-best_scores, axis=1, kind="stable")
+        best = np.take_along_axis(best, order, axis=1)
+        best_scores = np.take_along_axis(best_scores, order, axis=1)
+        for row_best, row_scores in zip(best, best_scores):
+            matches.append([
+                (int(column), float(score)) for column, score in zip(row_best, row_scores) if score > 0 and score >= min_score
+            ])
+    return matches
+
+
+def load_controls(pdf_path: str, cache_path: str = DEFAULT_CACHE_PATH, with_bodies: bool = False) -> list:
+    """
+    Extracts the controls of one benchmark with its Benchmark and Version attached, plus the
+    Description and Audit text when with_bodies is set.
+    """
+    benchmark, version = parse_benchmark_name(pdf_path)
+    scan = scan_benchmark(pdf_path, cache_path=cache_path)
+    controls = []
+    for control in scan["controls"]:
+        control = {**control, "benchmark": benchmark, "version": version}
+        if with_bodies:
+            control["body"] = " ".join(scan["bodies"].get(control["control_number"], field) or "" for field in ("Description", "Audit"))
+        controls.append(control)
+    return controls
+
+
+def map_controls(source_controls: list, target_controls: list, top_k: int = TOP_K, min_score: float = 0.0,
+                 with_bodies: bool = False) -> list:
+    """
+    Maps every source control to its top_k most similar target controls.
+
+    Titles are compared by the cosine similarity of their character n-gram TF-IDF vectors, which
+    tolerates rewording, renamed files and singular/plural changes between benchmark versions.
+    With with_bodies, BODY_WEIGHT of the score comes from the Description and Audit text (the
+    controls must have been loaded with with_bodies).
+
+    Returns:
+    - Output rows (see COLUMNS), grouped by source control and ranked by score.
+    """
+    texts = [control["control_name"] for control in source_controls + target_controls]
+    titles = tfidf_vectors(texts)
+    sources, targets = [titles[:len(source_controls)]], [titles[len(source_controls):]]
+    weights = [1.0]
+    if with_bodies:
+        bodies = tfidf_vectors([control.get("body", "") for control in source_controls + target_controls])
+        sources.append(bodies[:len(source_controls)])
+        targets.append(bodies[len(source_controls):])
+        weights = [1 - BODY_WEIGHT, BODY_WEIGHT]
+
+    rows = []
+    for source, matches in zip(source_controls, top_matches(sources, targets, top_k, min_score, weights)):
+        for rank, (target_row, score) in enumerate(matches, start=1):
+            target = target_controls[target_row]
+            rows.append({
+                "Source Benchmark": source["benchmark"],
+                "Source Version": source["version"],
+                "Source Control": source["control_number"],
+                "Source Title": source["control_name"],
+                "Rank": rank,
+                "Target Benchmark": target["benchmark"],
+                "Target Version": target["version"],
+                "Target Control": target["control_number"],
+                "Target Title": target["control_name"],
+                "Score": round(score, 4),
+            })
+    return rows
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Map the controls of one CIS benchmark onto the controls of others.")
+    parser.add_argument("source", help="Benchmark PDF whose controls are mapped")
+    parser.add_argument("targets", nargs="+", help="Benchmark PDFs, directories or glob patterns to map onto")
+    parser.add_argument("-o", "--output", default="CIS_Control_Mapping.csv", help="Mapping file (.csv, .xlsx, .jsonl or .parquet)")
+    parser.add_argument("-k", "--top", type=int, default=TOP_K, help=f"Matches per source control (default: {TOP_K})")
+    parser.add_argument("--min-score", type=float, default=0.0, help="Drop matches scoring below this (0-1)")
+    parser.add_argument("--bodies", action="store_true", help=f"Also compare Description and Audit text ({BODY_WEIGHT:.0%} of the score)")
+    parser.add_argument("--no-cache", action="store_true", help="Always re-parse PDFs instead of using the page text cache")
+    args = parser.parse_args(argv)
+
+    if os.path.splitext(args.output)[1].lower() not in SINKS:
+        parser.error(f"unsupported output format '{args.output}' (use one of: {', '.join(SINKS)})")
+    if args.top < 1:
+        parser.error("--top must be at least 1")
+
+    source_path = os.path.abspath(args.source)
+    target_paths = [path for path in find_pdfs(args.targets) if path != source_path]
+    if not target_paths:
+        logging.error(f"No target benchmark PDFs found in: {', '.join(args.targets)}")
+        return 1
+
+    cache_path = None if args.no_cache else DEFAULT_CACHE_PATH
+    source_controls = load_controls(source_path, cache_path, args.bodies)
+    target_controls = [control for path in target_paths for control in load_controls(path, cache_path, args.bodies)]
+
+    start = time.perf_counter()
+    rows = map_controls(source_controls, target_controls, args.top, args.min_score, args.bodies)
+    logging.info(
+        f"Mapped {len(source_controls)} controls onto {len(target_controls)} controls of {len(target_paths)} "
+        f"benchmark(s) in {time.perf_counter() - start:.2f}s."
+    )
+
+    with open_sink(args.output, COLUMNS) as sink:
+        for row in rows:
+            sink.write(row)
+    logging.info(f"Saved {sink.rows_written} matches to '{args.output}'.")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
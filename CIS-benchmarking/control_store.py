@@ -0,0 +1,128 @@
+from array import array
+
+# Body fields captured for each control, in the order they appear in a CIS recommendation
+BODY_FIELDS = ("Description", "Rationale", "Audit", "Remediation", "Default Value", "References")
+
+# Every section heading of a CIS recommendation; the ones not in BODY_FIELDS end a field without
+# starting a captured one (e.g. "CIS Controls:" is followed by the mapping table)
+SECTION_HEADINGS = {
+    f"{name}:" for name in BODY_FIELDS + ("Profile Applicability", "Impact", "Additional Information", "CIS Controls")
+}
+
+# Slots per record in the offsets array: (start, end) per field, then (first page, last page)
+RECORD_SIZE = 2 * len(BODY_FIELDS) + 2
+
+
+class ControlBodyStore:
+    """
+    Compact store for control body text.
+
+    All captured field text lives in one shared string buffer. Each control is a fixed-size slice
+    of a flat integer array holding the start/end offset of every field plus the page span of the
+    control body, so a single field can be read back without re-parsing and without keeping a
+    dict of strings per control.
+
+    Text is appended while pages stream past; freeze() joins the buffer once scanning is done.
+    """
+
+    def __init__(self):
+        self.index = {}
+        self.offsets = array("l")
+        self.buffer = ""
+        self._chunks = []
+        self._length = 0
+        self._record = None
+        self._field = None
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, control_number: str) -> bool:
+        return control_number in self.index
+
+    def __getstate__(self):
+        # Pickle (e.g. from batch worker processes) only the frozen buffer and offsets
+        return {"index": self.index, "offsets": self.offsets, "buffer": self.buffer}
+
+    def __setstate__(self, state):
+        self.__init__()
+        self.index = state["index"]
+        self.offsets = state["offsets"]
+        self.buffer = state["buffer"]
+
+    def start_control(self, control_number: str, page_number: int) -> None:
+        """
+        Starts (or restarts) the record for a control whose body heading is on page_number.
+        """
+        self._close_field()
+        if control_number in self.index:
+            self._record = self.index[control_number]
+        else:
+            self._record = len(self.index)
+            self.index[control_number] = self._record
+            self.offsets.extend([-1] * RECORD_SIZE)
+        base = self._record * RECORD_SIZE
+        self.offsets[base + RECORD_SIZE - 2] = page_number
+        self.offsets[base + RECORD_SIZE - 1] = page_number
+
+    def end_control(self) -> None:
+        self._close_field()
+        self._record = None
+
+    def add_line(self, page_number: int, line: str) -> None:
+        """
+        Routes one body line of the current control: section headings switch the active field,
+        other lines are appended to it.
+        """
+        if self._record is None:
+            return
+        self.offsets[self._record * RECORD_SIZE + RECORD_SIZE - 1] = page_number
+        if line in SECTION_HEADINGS:
+            self._close_field()
+            name = line[:-1]
+            if name in BODY_FIELDS:
+                self._field = BODY_FIELDS.index(name)
+                slot = self._record * RECORD_SIZE + 2 * self._field
+                self.offsets[slot] = self._length
+                self.offsets[slot + 1] = self._length
+            return
+        if self._field is None:
+            return
+        if self._length != self.offsets[self._record * RECORD_SIZE + 2 * self._field]:
+            line = "\n" + line
+        self._chunks.append(line)
+        self._length += len(line)
+
+    def _close_field(self) -> None:
+        if self._field is not None:
+            self.offsets[self._record * RECORD_SIZE + 2 * self._field + 1] = self._length
+            self._field = None
+
+    def freeze(self) -> None:
+        self.end_control()
+        self.buffer += "".join(self._chunks)
+        self._chunks = []
+
+    def get(self, control_number: str, field: str) -> str:
+        """
+        Returns one body field of a control ("" when the control or field was not found).
+        """
+        record = self.index.get(control_number)
+        if record is None:
+            return ""
+        slot = record * RECORD_SIZE + 2 * BODY_FIELDS.index(field)
+        start, end = self.offsets[slot], self.offsets[slot + 1]
+        return self.buffer[start:end] if start >= 0 else ""
+
+    def page_span(self, control_number: str) -> tuple:
+        """
+        Returns (first_page, last_page) of a control's body, or None when it was not found.
+        """
+        record = self.index.get(control_number)
+        if record is None:
+            return None
+        base = record * RECORD_SIZE
+        return self.offsets[base + RECORD_SIZE - 2], self.offsets[base + RECORD_SIZE - 1]
+
+    def fields(self, control_number: str) -> dict:
+        return {field: self.get(control_number, field) for field in BODY_FIELDS}
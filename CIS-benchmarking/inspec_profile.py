@@ -0,0 +1,166 @@
+import hashlib
+import json
+import os
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# Manifest of the content hash of every generated file, relative to the profile directory
+MANIFEST_NAME = ".inspec-checksums.json"
+
+# InSpec impact per automation status (impact 0.0 marks a control as informational/manual)
+IMPACT = {"Automated": 1.0, "Manual": 0.0}
+
+
+def slugify(value: str) -> str:
+    return re.sub(r"[^a-z0-9.]+", "-", value.lower()).strip("-")
+
+
+def control_id(control: dict, benchmark_prefix: str = None) -> str:
+    """
+    InSpec control id: the "Inspec Profile Control Name" (e.g. "3.1.1.1_Disable_writesrv"),
+    prefixed with the benchmark slug when several benchmarks share one profile (and its version
+    when several versions of the benchmark do, e.g. "ibm-aix-7.1-v2.1.0").
+    """
+    name = control["control_number"] + "_" + control["control_name"].replace(" ", "_")
+    return f"{benchmark_prefix}-{name}" if benchmark_prefix else name
+
+
+def ruby_string(value: str) -> str:
+    return "'" + value.replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def render_control(control: dict, fields: dict, benchmark: str, version: str, inspec_id: str) -> str:
+    """
+    Renders one control as InSpec Ruby source.
+    """
+    level_match = re.search(r"\d", control["profile"])
+    lines = [
+        f"control {ruby_string(inspec_id)} do",
+        f"  title {ruby_string(control['control_name'])}",
+        f"  desc {ruby_string(fields.get('Description', ''))}",
+    ]
+    for label, field in (("rationale", "Rationale"), ("check", "Audit"), ("fix", "Remediation"), ("default", "Default Value")):
+        if fields.get(field):
+            lines.append(f"  desc {ruby_string(label)}, {ruby_string(fields[field])}")
+    lines += [
+        f"  impact {IMPACT.get(control['automation_status'], 0.0)}",
+        f"  tag cis_control: {ruby_string(control['control_number'])}",
+        f"  tag cis_level: {level_match.group(0) if level_match else 'nil'}",
+        f"  tag automated: {'true' if control['automation_status'] == 'Automated' else 'false'}",
+        f"  tag category: {ruby_string(control['category'])}",
+        f"  tag benchmark: {ruby_string(benchmark)}, benchmark_version: {ruby_string(version)}",
+    ]
+    if fields.get("References"):
+        lines.append(f"  ref {ruby_string(fields['References'])}")
+    lines += [
+        "",
+        f"  describe {ruby_string('CIS ' + control['control_number'])} do",
+        f"    skip {ruby_string('Manual review required; see the check description.' if control['automation_status'] == 'Manual' else 'Audit not yet implemented; see the check description.')}",
+        "  end",
+        "end",
+        "",
+    ]
+    return "\n".join(lines)
+
+
+def render_inspec_yml(name: str, results: list) -> str:
+    """
+    Renders inspec.yml for a profile covering the given extraction results.
+    """
+    benchmarks = [f"CIS {result['benchmark']} Benchmark {result['version']}" for result in results]
+    version = results[0]["version"].lstrip("v") if len(results) == 1 else "1.0.0"
+    lines = [
+        f"name: {name}",
+        f"title: \"{benchmarks[0] if len(results) == 1 else 'CIS Benchmarks'}\"",
+        "summary: \"InSpec controls generated from CIS benchmark PDFs\"",
+        f"version: {version}",
+        "license: \"Proprietary\"",
+        "supports:",
+        "  - platform: os",
+        "benchmarks:",
+    ]
+    lines += [f"  - \"{benchmark}\"" for benchmark in benchmarks]
+    return "\n".join(lines) + "\n"
+
+
+def _write_if_changed(profile_dir: str, relative_path: str, content: str, previous_hash: str) -> tuple:
+    """
+    Writes one file unless its content hash matches the manifest and the file still exists.
+    Returns (relative_path, content_hash, written).
+    """
+    content_hash = hashlib.sha256(content.encode("utf-8")).hexdigest()
+    path = os.path.join(profile_dir, relative_path)
+    if content_hash == previous_hash and os.path.exists(path):
+        return relative_path, content_hash, False
+    with open(path, "w", encoding="utf-8", newline="\n") as f:
+        f.write(content)
+    return relative_path, content_hash, True
+
+
+def write_profile(profile_dir: str, results: list, name: str = None, jobs: int = None, prune: bool = True) -> dict:
+    """
+    Generates an InSpec profile directory (inspec.yml plus one controls/*.rb per control) from
+    extraction results ({"benchmark", "version", "controls", "bodies"}).
+
+    Files are rendered and written in parallel. A file is only rewritten when its content hash
+    differs from the manifest of the previous run, and control files of controls that no longer
+    exist are removed, so regenerating a profile leaves unchanged controls untouched. With
+    prune=False (e.g. results of a page or section selection) other existing controls are kept.
+
+    Returns:
+    - {"written": n, "unchanged": n, "removed": n}
+
+    Raises:
+    - ValueError: Two results are the same benchmark and version, so their controls would share
+      file names.
+    """
+    seen = set()
+    for result in results:
+        if (result["benchmark"], result["version"]) in seen:
+            raise ValueError(
+                f"{result['benchmark']} {result['version']} is extracted more than once ({os.path.basename(result.get('file', ''))}); "
+                f"generate the profile from one file per benchmark version."
+            )
+        seen.add((result["benchmark"], result["version"]))
+    versioned = {benchmark for benchmark, _ in seen if sum(other == benchmark for other, _ in seen) > 1}
+
+    os.makedirs(os.path.join(profile_dir, "controls"), exist_ok=True)
+    manifest_path = os.path.join(profile_dir, MANIFEST_NAME)
+    previous = {}
+    if os.path.exists(manifest_path):
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            previous = json.load(f)
+
+    if name is None:
+        name = slugify(f"cis-{results[0]['benchmark']}") if len(results) == 1 else "cis-benchmarks"
+    files = {"inspec.yml": render_inspec_yml(name, results)}
+    for result in results:
+        prefix = None
+        if len(results) > 1:
+            prefix = slugify(result["benchmark"] + (f" {result['version']}" if result["benchmark"] in versioned else ""))
+        bodies = result.get("bodies")
+        for control in result["controls"].values():
+            inspec_id = control_id(control, prefix)
+            fields = bodies.fields(control["control_number"]) if bodies is not None else {}
+            file_name = re.sub(r"[^A-Za-z0-9._-]+", "_", inspec_id) + ".rb"
+            files[os.path.join("controls", file_name)] = render_control(control, fields, result["benchmark"], result["version"], inspec_id)
+
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        outcomes = list(pool.map(
+            lambda item: _write_if_changed(profile_dir, item[0], item[1], previous.get(item[0])),
+            files.items(),
+        ))
+
+    removed = 0
+    manifest = {} if prune else dict(previous)
+    for relative_path in previous if prune else ():
+        if relative_path not in files and os.path.exists(os.path.join(profile_dir, relative_path)):
+            os.remove(os.path.join(profile_dir, relative_path))
+            removed += 1
+
+    manifest.update((path, content_hash) for path, content_hash, _ in outcomes)
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+
+    written = sum(1 for _, _, was_written in outcomes if was_written)
+    return {"written": written, "unchanged": len(outcomes) - written, "removed": removed}
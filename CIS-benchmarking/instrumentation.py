@@ -0,0 +1,97 @@
+import json
+import time
+from contextlib import contextmanager
+
+
+class Stats:
+    """
+    Collects wall time per pipeline stage and event counters.
+
+    Streaming stages (decoding, scanning, hashing) interleave page by page, so each stage adds up
+    the time spent in its own code rather than timing one enclosing block.
+    """
+
+    def __init__(self):
+        self.timings = {}
+        self.counters = {}
+
+    def reset(self) -> None:
+        self.timings = {}
+        self.counters = {}
+
+    def add_time(self, name: str, seconds: float) -> None:
+        self.timings[name] = self.timings.get(name, 0.0) + seconds
+
+    def count(self, name: str, n: int = 1) -> None:
+        self.counters[name] = self.counters.get(name, 0) + n
+
+    @contextmanager
+    def span(self, name: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add_time(name, time.perf_counter() - start)
+
+    def as_dict(self) -> dict:
+        return {"timings": dict(self.timings), "counters": dict(self.counters)}
+
+    def merge(self, other: dict) -> None:
+        """
+        Adds the timings and counters of another run (as returned by as_dict), e.g. from a worker process.
+        """
+        for name, seconds in other["timings"].items():
+            self.add_time(name, seconds)
+        for name, n in other["counters"].items():
+            self.count(name, n)
+
+    def format_table(self) -> str:
+        lines = [f"{'Stage':<24} {'Seconds':>10}"]
+        lines += [f"{name:<24} {seconds:>10.3f}" for name, seconds in self.timings.items()]
+        lines += ["", f"{'Counter':<24} {'Count':>10}"]
+        lines += [f"{name:<24} {n:>10}" for name, n in self.counters.items()]
+        return "\n".join(lines)
+
+    def to_json(self) -> str:
+        return json.dumps(self.as_dict(), indent=2)
+
+
+# Process-wide recorder the pipeline modules report into
+stats = Stats()
+
+
+@contextmanager
+def profiled(path: str):
+    """
+    Profiles the enclosed block and writes the result to path: an HTML report when path ends with
+    .html (requires pyinstrument), otherwise a cProfile dump readable with pstats or snakeviz.
+    A path of None disables profiling.
+    """
+    if path is None:
+        yield
+        return
+
+    if path.lower().endswith(".html"):
+        try:
+            from pyinstrument import Profiler
+        except ImportError:
+            raise ImportError("HTML profiles require pyinstrument (pip install pyinstrument).")
+        profiler = Profiler()
+        profiler.start()
+        try:
+            yield
+        finally:
+            profiler.stop()
+            with open(path, "w", encoding="utf-8") as f:
+                f.write(profiler.output_html())
+        return
+
+    import cProfile
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        profiler.dump_stats(path)
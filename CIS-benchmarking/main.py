@@ -1,62 +1,43 @@
-import pymupdf  # PyMuPDF
-import pandas as pd
-import re
+from cis_parser import control_row, scan_pages
+from instrumentation import stats
+from output_sinks import open_sink
+from page_cache import DEFAULT_CACHE_PATH, iter_cached_page_texts
+from workbook_upsert import UpsertSink
 
 # Load the PDF file
 pdf_path = "CIS-benchmarking\documents\CIS_IBM_AIX_7.1_Benchmark_v2.1.0_ARCHIVE.pdf"  # Update your file path
-doc = pymupdf.open(pdf_path)
 
-# Function to extract text from the PDF
-def extract_text_from_pdf(doc):
-    text = ""
-    for page in doc:
-        text += page.get_text("text") + "\n"
-    return text
+# Number of processes used to extract page text (1 = serial, 0 = one per CPU)
+workers = 1
 
-# Extract full text from PDF
-full_text = extract_text_from_pdf(doc)
+# Page text cache, reused while the PDF content is unchanged (None = always re-parse the PDF)
+cache_path = DEFAULT_CACHE_PATH
 
-# Regex pattern to extract CIS controls (e.g., "3.1.1.1 Disable writesrv (Automated)")
-control_pattern = re.compile(r"(\d+\.\d+(?:\.\d+)?(?:\.\d+)?)\s(.+?)\s\((Automated|Manual)\)")
+# Merge into the existing workbook (updating changed columns, appending new controls and keeping
+# columns added by hand) instead of rewriting it
+upsert = False
 
-# Regex pattern to extract section headers (e.g., "2 Data Protection")
-section_pattern = re.compile(r"^(\d+)\s([A-Za-z\s\-]+)$", re.MULTILINE)
+# Print stage timings and counters (decoding, cache, scanning, writing) after the run
+show_stats = False
 
-# Extract all section headers
-sections = section_pattern.findall(full_text)
 
-# Convert extracted sections into a dictionary {section_number: category_name}
-category_map = {sec_num: sec_name.strip() for sec_num, sec_name in sections}
+def main():
+    # Stream page texts through the one-pass control scanner
+    scan = scan_pages(iter_cached_page_texts(pdf_path, workers=workers, cache_path=cache_path))
 
-# Extract matches (CIS controls)
-matches = control_pattern.findall(full_text)
+    # Save to Excel for easy review, streaming rows as they are built (format chosen by file extension)
+    output_path = "CIS_AIX_Controls_v0.xlsx"
+    sink = UpsertSink(output_path) if upsert else open_sink(output_path)
+    with stats.span("write"), sink:
+        for control in scan["controls"]:
+            sink.write(control_row(control))
+    stats.count("rows written", sink.rows_written)
 
-# Convert matches into structured data
-data = []
-current_category = None  # To track which section each control belongs to
+    print("Extraction complete. Data saved to 'CIS_AIX_Controls_v#.xlsx'.")
 
-for match in matches:
-    control_number, control_name, automation_status = match
+    if show_stats:
+        print(stats.format_table())
 
-    # Determine category based on the first number in the control (e.g., "2.1.1.1" -> "2" -> "Data Protection")
-    section_number = control_number.split(".")[0]
-    current_category = category_map.get(section_number, "Unknown")
 
-    # Format Inspec Profile Control Name (replace spaces with underscores but keep dashes)
-    formatted_name = control_number + "_" + control_name.replace(" ", "_")
-
-    # Append to data
-    data.append({
-        "Category": current_category,
-        "Control Name": control_name,
-        "Automated/Manual": automation_status,
-        "Inspec Profile Control Name": formatted_name
-    })
-
-# Convert to DataFrame
-df = pd.DataFrame(data)
-
-# Save to Excel for easy review
-df.to_excel("CIS_AIX_Controls_v0.xlsx", index=False)
-
-print("Extraction complete. Data saved to 'CIS_AIX_Controls_v#.xlsx'.")
\ No newline at end of file
+if __name__ == "__main__":
+    main()
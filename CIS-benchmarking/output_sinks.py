@@ -0,0 +1,153 @@
+import csv
+import json
+import os
+
+
+class RowSink:
+    """
+    Base class for streaming row writers. Rows are dicts written one at a time; the output file is
+    only created on the first write, and the column order is taken from the first row unless
+    columns are given.
+    """
+
+    def __init__(self, path: str, columns: list = None):
+        self.path = path
+        self.columns = list(columns) if columns else None
+        self.rows_written = 0
+        self.closed = False
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+    def write(self, row: dict) -> None:
+        if self.rows_written == 0:
+            if self.columns is None:
+                self.columns = list(row)
+            self._open()
+        self._write([row.get(column) for column in self.columns])
+        self.rows_written += 1
+
+    def close(self) -> None:
+        # Safe to call more than once (e.g. explicitly inside the with block)
+        if self.rows_written and not self.closed:
+            self._close()
+        self.closed = True
+
+    def _open(self) -> None:
+        raise NotImplementedError
+
+    def _write(self, values: list) -> None:
+        raise NotImplementedError
+
+    def _close(self) -> None:
+        raise NotImplementedError
+
+
+class CsvSink(RowSink):
+    def _open(self) -> None:
+        self.file = open(self.path, "w", newline="", encoding="utf-8")
+        self.writer = csv.writer(self.file)
+        self.writer.writerow(self.columns)
+
+    def _write(self, values: list) -> None:
+        self.writer.writerow(values)
+
+    def _close(self) -> None:
+        self.file.close()
+
+
+class JsonLinesSink(RowSink):
+    def _open(self) -> None:
+        self.file = open(self.path, "w", encoding="utf-8")
+
+    def _write(self, values: list) -> None:
+        self.file.write(json.dumps(dict(zip(self.columns, values)), ensure_ascii=False) + "\n")
+
+    def _close(self) -> None:
+        self.file.close()
+
+
+class XlsxSink(RowSink):
+    """
+    Writes through openpyxl's write-only mode, which streams rows to disk instead of building the
+    whole worksheet in memory.
+    """
+
+    def _open(self) -> None:
+        from openpyxl import Workbook
+
+        self.workbook = Workbook(write_only=True)
+        self.worksheet = self.workbook.create_sheet()
+        self.worksheet.append(self.columns)
+
+    def _write(self, values: list) -> None:
+        self.worksheet.append(values)
+
+    def _close(self) -> None:
+        self.workbook.save(self.path)
+
+
+class ParquetSink(RowSink):
+    """
+    Writes row groups of BATCH_SIZE rows with pyarrow (optional dependency).
+    """
+
+    BATCH_SIZE = 10000
+
+    def _open(self) -> None:
+        try:
+            import pyarrow
+            import pyarrow.parquet
+        except ImportError:
+            raise ImportError("Parquet output requires pyarrow (pip install pyarrow).")
+        self.pyarrow = pyarrow
+        self.writer = None
+        self.batch = []
+
+    def _flush(self) -> None:
+        table = self.pyarrow.Table.from_pylist(
+            [dict(zip(self.columns, values)) for values in self.batch],
+            schema=self.writer.schema if self.writer else None,
+        )
+        if self.writer is None:
+            # Columns that are empty in the first batch are typed as strings rather than null
+            schema = self.pyarrow.schema([
+                field.with_type(self.pyarrow.string()) if self.pyarrow.types.is_null(field.type) else field
+                for field in table.schema
+            ])
+            table = table.cast(schema)
+            self.writer = self.pyarrow.parquet.ParquetWriter(self.path, schema)
+        self.writer.write_table(table)
+        self.batch = []
+
+    def _write(self, values: list) -> None:
+        self.batch.append(values)
+        if len(self.batch) >= self.BATCH_SIZE:
+            self._flush()
+
+    def _close(self) -> None:
+        if self.batch:
+            self._flush()
+        self.writer.close()
+
+
+# Output sinks by file extension
+SINKS = {
+    ".csv": CsvSink,
+    ".jsonl": JsonLinesSink,
+    ".parquet": ParquetSink,
+    ".xlsx": XlsxSink,
+}
+
+
+def open_sink(path: str, columns: list = None) -> RowSink:
+    """
+    Returns the streaming sink matching the output file's extension (.csv, .jsonl, .parquet or .xlsx).
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in SINKS:
+        raise ValueError(f"Unsupported output format '{extension}'. Use one of: {', '.join(SINKS)}.")
+    return SINKS[extension](path, columns)
@@ -0,0 +1,275 @@
+import hashlib
+import heapq
+import json
+import os
+import sqlite3
+import time
+import zlib
+from contextlib import closing
+
+from instrumentation import stats
+from pdf_text import iter_page_texts, page_count, read_outline
+
+# Default location of the page text cache (a single SQLite file shared by every benchmark PDF)
+DEFAULT_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".cache", "page_text.sqlite")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS documents (
+    doc_key TEXT PRIMARY KEY,
+    pdf_path TEXT NOT NULL,
+    page_count INTEGER NOT NULL
+);
+CREATE TABLE IF NOT EXISTS pages (
+    doc_key TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (doc_key, page_number)
+);
+CREATE TABLE IF NOT EXISTS staged_pages (
+    doc_key TEXT NOT NULL,
+    page_number INTEGER NOT NULL,
+    pdf_path TEXT NOT NULL,
+    text BLOB NOT NULL,
+    PRIMARY KEY (doc_key, page_number)
+);
+CREATE TABLE IF NOT EXISTS outlines (
+    doc_key TEXT PRIMARY KEY,
+    pdf_path TEXT NOT NULL,
+    page_count INTEGER NOT NULL,
+    outline TEXT NOT NULL
+);
+"""
+
+# Pages compressed and staged per insert while a cache miss is decoded
+WRITE_BATCH_PAGES = 64
+
+
+def file_sha256(path: str, chunk_size: int = 1 << 20) -> str:
+    """
+    Returns the SHA-256 hex digest of a file's content, read in chunks.
+    """
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(chunk_size), b""):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def pymupdf_version() -> str:
+    """
+    Installed PyMuPDF version, read from the package metadata: importing PyMuPDF itself takes
+    longer than serving a whole document from the cache.
+    """
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("PyMuPDF")
+    except PackageNotFoundError:
+        import pymupdf  # PyMuPDF
+
+        return pymupdf.__version__
+
+
+def document_key(pdf_path: str) -> str:
+    """
+    Cache key for a PDF: its content hash plus the pymupdf version that decoded it, so both an
+    edited file and a pymupdf upgrade produce a fresh key.
+    """
+    return f"{file_sha256(pdf_path)}:pymupdf-{pymupdf_version()}"
+
+
+def open_cache(cache_path: str = DEFAULT_CACHE_PATH) -> sqlite3.Connection:
+    os.makedirs(os.path.dirname(os.path.abspath(cache_path)), exist_ok=True)
+    # Several batch workers may share the cache; WAL lets readers proceed while one writer commits
+    conn = sqlite3.connect(cache_path, timeout=60)
+    conn.execute("PRAGMA journal_mode=WAL")
+    conn.executescript(SCHEMA)
+    return conn
+
+
+def _delete_document(conn: sqlite3.Connection, doc_key: str) -> None:
+    conn.execute("DELETE FROM pages WHERE doc_key = ?", (doc_key,))
+    conn.execute("DELETE FROM documents WHERE doc_key = ?", (doc_key,))
+
+
+def _staged(conn: sqlite3.Connection, doc_key: str, pdf_path: str, pages):
+    """
+    Passes (page_number, text) pairs through, staging them compressed in batches of
+    WRITE_BATCH_PAGES. Each batch is committed on its own, so the cache is only locked briefly and
+    the staged pages survive an interrupted run.
+    """
+    abs_path = os.path.abspath(pdf_path)
+    batch = []
+    for page_number, text in pages:
+        batch.append((doc_key, page_number, abs_path, zlib.compress(text.encode("utf-8"))))
+        if len(batch) >= WRITE_BATCH_PAGES:
+            _stage_pages(conn, batch)
+            batch = []
+        yield page_number, text
+    _stage_pages(conn, batch)
+
+
+def _stage_pages(conn: sqlite3.Connection, rows: list) -> None:
+    conn.executemany("INSERT OR REPLACE INTO staged_pages (doc_key, page_number, pdf_path, text) VALUES (?, ?, ?, ?)", rows)
+    conn.commit()
+
+
+def _iter_staged_pages(conn: sqlite3.Connection, doc_key: str, page_numbers: list):
+    # Reads the given staged pages back a batch at a time; querying by page number keeps pages
+    # staged meanwhile by the same run from being read twice
+    for index in range(0, len(page_numbers), WRITE_BATCH_PAGES):
+        batch = page_numbers[index:index + WRITE_BATCH_PAGES]
+        rows = conn.execute(
+            f"SELECT page_number, text FROM staged_pages WHERE doc_key = ? AND page_number IN ({', '.join('?' * len(batch))}) "
+            "ORDER BY page_number",
+            (doc_key, *batch),
+        ).fetchall()
+        for page_number, blob in rows:
+            yield page_number, zlib.decompress(blob).decode("utf-8")
+
+
+def _store_document(conn: sqlite3.Connection, doc_key: str, pdf_path: str, page_count: int) -> None:
+    """
+    Moves a fully decoded document from the staged pages into the cache in one transaction and
+    drops entries for older content of the same file path. Nothing is stored when the staged
+    pages are incomplete, e.g. because a concurrent run of the same file stored them first.
+    """
+    conn.execute("BEGIN IMMEDIATE")
+    staged = conn.execute("SELECT COUNT(*) FROM staged_pages WHERE doc_key = ?", (doc_key,)).fetchone()[0]
+    if staged != page_count:
+        conn.rollback()
+        return
+    _delete_document(conn, doc_key)
+    conn.execute(
+        "INSERT OR REPLACE INTO pages (doc_key, page_number, text) SELECT doc_key, page_number, text FROM staged_pages WHERE doc_key = ?",
+        (doc_key,),
+    )
+    abs_path = os.path.abspath(pdf_path)
+    stale_keys = conn.execute(
+        "SELECT doc_key FROM documents WHERE pdf_path = ? AND doc_key != ?", (abs_path, doc_key)
+    ).fetchall()
+    for (stale_key,) in stale_keys:
+        _delete_document(conn, stale_key)
+        conn.execute("DELETE FROM outlines WHERE doc_key = ?", (stale_key,))
+    conn.execute(
+        "INSERT OR REPLACE INTO documents (doc_key, pdf_path, page_count) VALUES (?, ?, ?)",
+        (doc_key, abs_path, page_count),
+    )
+    conn.execute("DELETE FROM staged_pages WHERE doc_key = ? OR pdf_path = ?", (doc_key, abs_path))
+    conn.commit()
+
+
+def document_info(pdf_path: str, cache_path: str = DEFAULT_CACHE_PATH, doc_key: str = None) -> dict:
+    """
+    Returns {"page_count", "outline"} of a PDF (outline as returned by read_outline).
+
+    Both are cached by content like the page texts, so a run whose pages are also cached never
+    opens the PDF or imports PyMuPDF. cache_path None reads them from the PDF. doc_key is the
+    document_key of the PDF when the caller already has it, so the file is not hashed again.
+    """
+    if cache_path is None:
+        return {"page_count": page_count(pdf_path), "outline": read_outline(pdf_path)}
+
+    doc_key = doc_key or document_key(pdf_path)
+    with closing(open_cache(cache_path)) as conn:
+        row = conn.execute("SELECT page_count, outline FROM outlines WHERE doc_key = ?", (doc_key,)).fetchone()
+        if row:
+            return {"page_count": row[0], "outline": json.loads(row[1])}
+
+        info = {"page_count": page_count(pdf_path), "outline": read_outline(pdf_path)}
+        abs_path = os.path.abspath(pdf_path)
+        with conn:
+            conn.execute("DELETE FROM outlines WHERE pdf_path = ? AND doc_key != ?", (abs_path, doc_key))
+            conn.execute(
+                "INSERT OR REPLACE INTO outlines (doc_key, pdf_path, page_count, outline) VALUES (?, ?, ?, ?)",
+                (doc_key, abs_path, info["page_count"], json.dumps(info["outline"])),
+            )
+    return info
+
+
+def iter_cached_page_texts(pdf_path: str, workers: int = 1, cache_path: str = DEFAULT_CACHE_PATH,
+                           page_numbers: list = None, journal=None, doc_key: str = None):
+    """
+    Yields (page_number, text) for every page in the PDF, or only the selected pages, served from
+    the on-disk cache when the same file content has been extracted before.
+
+    On a cache miss the PDF is decoded with iter_page_texts and each page is compressed as it
+    streams past and staged in the cache in batches, so memory stays flat however long the
+    document is. The staged pages are moved into the cache in one short transaction once every page
+    has been decoded, so an interrupted run never leaves a partial document behind and concurrent
+    extractions do not hold the cache locked while decoding. The staged pages also checkpoint the
+    decode: a later run of the same file reads them back and only decodes the remaining pages.
+    Entries for older content of the same file path are dropped once a document is stored. A
+    selective decode (page_numbers given) is read from the cache when possible but never stored,
+    since the cache only holds complete documents.
+
+    Parameters:
+    - pdf_path: Path to the benchmark PDF.
+    - workers: Number of processes used on a cache miss (see iter_page_texts).
+    - cache_path: SQLite cache file. None disables caching.
+    - page_numbers: Optional 0-based page numbers to return (see iter_page_texts).
+    - journal: Optional CheckpointJournal that full decodes resume from and checkpoint pages into
+      when caching is disabled (with the cache, its staged pages are the checkpoint).
+    - doc_key: document_key of the PDF when the caller already has it.
+    """
+    if cache_path is None:
+        # Selective decodes are not checkpointed
+        if journal is not None and page_numbers is None:
+            yield from journal.iter_page_texts(pdf_path, doc_key or document_key(pdf_path), workers)
+        else:
+            yield from iter_page_texts(pdf_path, workers, page_numbers=page_numbers)
+        return
+
+    with stats.span("cache lookup"):
+        doc_key = doc_key or document_key(pdf_path)
+        conn = open_cache(cache_path)
+        hit = conn.execute("SELECT 1 FROM documents WHERE doc_key = ?", (doc_key,)).fetchone()
+    with closing(conn):
+        if hit:
+            stats.count("cache hits")
+            if page_numbers is None:
+                rows = conn.execute(
+                    "SELECT page_number, text FROM pages WHERE doc_key = ? ORDER BY page_number", (doc_key,)
+                )
+            else:
+                rows = (
+                    (page_number, row[0])
+                    for page_number in sorted(set(page_numbers))
+                    for row in conn.execute(
+                        "SELECT text FROM pages WHERE doc_key = ? AND page_number = ?", (doc_key, page_number)
+                    )
+                )
+            for page_number, blob in rows:
+                start = time.perf_counter()
+                text = zlib.decompress(blob).decode("utf-8")
+                stats.add_time("cache read", time.perf_counter() - start)
+                stats.count("pages from cache")
+                yield page_number, text
+            return
+        stats.count("cache misses")
+        if page_numbers is not None:
+            yield from iter_page_texts(pdf_path, workers, page_numbers=page_numbers)
+            return
+
+        # Cache miss: stage pages while passing them through, then store them together. Pages staged
+        # by an earlier, interrupted run are read back instead of being decoded again
+        staged = [
+            page_number for (page_number,) in
+            conn.execute("SELECT page_number FROM staged_pages WHERE doc_key = ? ORDER BY page_number", (doc_key,))
+        ]
+        if staged:
+            stats.count("pages resumed", len(staged))
+            done = set(staged)
+            remaining = [page_number for page_number in range(page_count(pdf_path)) if page_number not in done]
+            decoded = _staged(conn, doc_key, pdf_path, iter_page_texts(pdf_path, workers, page_numbers=remaining))
+            pages = heapq.merge(_iter_staged_pages(conn, doc_key, staged), decoded)
+        else:
+            pages = _staged(conn, doc_key, pdf_path, iter_page_texts(pdf_path, workers))
+        page_total = 0
+        for page_number, text in pages:
+            page_total += 1
+            yield page_number, text
+
+        with stats.span("cache write"):
+            _store_document(conn, doc_key, pdf_path, page_total)
+
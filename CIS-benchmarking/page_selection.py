@@ -0,0 +1,130 @@
+from cis_parser import HEADING_PATTERN, PAGE_HEADER_PATTERN, TOC_LINE_PATTERN
+from page_cache import DEFAULT_CACHE_PATH, document_info, iter_cached_page_texts
+
+# Pages searched for the Table of Contents at the front of a benchmark
+MAX_TOC_PAGES = 40
+
+
+def parse_page_ranges(spec: str) -> list:
+    """
+    Parses a page selection such as "40-60,75,300-" into (start, stop) ranges, with stop None for
+    an open range, without knowing the document's length (e.g. to validate --pages up front).
+
+    Raises:
+    - ValueError for malformed parts and for ranges whose start is after their end.
+    """
+    ranges = []
+    for part in spec.split(","):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            if "-" in part:
+                start, stop = part.split("-", 1)
+                start = int(start) if start.strip() else 0
+                stop = int(stop) if stop.strip() else None
+            else:
+                start = stop = int(part)
+        except ValueError:
+            raise ValueError(f"Invalid page selection '{part}' (expected e.g. '40-60,75,300-').")
+        if stop is not None and start > stop:
+            raise ValueError(f"Invalid page range '{part}': start is after end.")
+        ranges.append((start, stop))
+    return ranges
+
+
+def parse_page_spec(spec: str, last_page: int) -> list:
+    """
+    Parses a page selection such as "40-60,75,300-" into a sorted list of page numbers.
+    Page numbers are the 0-based page numbers used in the output's Page column (in CIS
+    benchmarks they match the printed "Page N" header); an open range ends at last_page, and
+    pages past last_page are dropped.
+    """
+    pages = set()
+    for start, stop in parse_page_ranges(spec):
+        stop = last_page if stop is None else min(stop, last_page)
+        pages.update(range(max(start, 0), stop + 1))
+    return sorted(pages)
+
+
+def read_front_toc(pdf_path: str, cache_path: str = DEFAULT_CACHE_PATH, doc_key: str = None) -> tuple:
+    """
+    Decodes the front pages of a benchmark one at a time until its Table of Contents ends.
+
+    Returns:
+    - (toc_pages, entries): the page numbers holding TOC lines, and (number, page) for every
+      numbered TOC entry with a page number, in document order.
+    """
+    toc_pages, entries = [], []
+    pages = iter_cached_page_texts(pdf_path, cache_path=cache_path, page_numbers=range(MAX_TOC_PAGES), doc_key=doc_key)
+    for page_number, text in pages:
+        page_entries = []
+        for line in text.splitlines():
+            line = line.strip()
+            toc_match = TOC_LINE_PATTERN.match(line) if line and not PAGE_HEADER_PATTERN.match(line) else None
+            if toc_match:
+                number, _, page, page_after_single_dot = toc_match.groups()
+                page = page or page_after_single_dot
+                if page:
+                    page_entries.append((number, int(page)))
+        if page_entries:
+            toc_pages.append(page_number)
+            entries.extend(page_entries)
+        elif toc_pages:
+            break
+    return toc_pages, entries
+
+
+def outline_sections(outline: list) -> list:
+    """
+    Returns (number, page) for every numbered outline entry (e.g. "3 Network", "3.1.1 ..."),
+    with pages converted to 0-based page numbers.
+    """
+    sections = []
+    for _, title, page in outline:
+        heading_match = HEADING_PATTERN.match(title.strip())
+        if heading_match and page > 0:
+            sections.append((heading_match.group(1), page - 1))
+    return sections
+
+
+def section_pages(entries: list, section: str, last_page: int) -> range:
+    """
+    Page range of one section: from its own entry up to the page before the next entry outside
+    the section (or the end of the document).
+    """
+    for index, (number, start) in enumerate(entries):
+        if number == section:
+            break
+    else:
+        raise ValueError(f"Section '{section}' not found in the benchmark outline or Table of Contents.")
+    stop = last_page + 1
+    for number, page in entries[index + 1:]:
+        if number != section and not number.startswith(section + "."):
+            stop = page
+            break
+    return range(start, max(stop, start + 1))
+
+
+def select_pages(pdf_path: str, pages: str = None, sections: list = None, cache_path: str = DEFAULT_CACHE_PATH,
+                 doc_key: str = None) -> dict:
+    """
+    Resolves --pages / --sections selectors for one PDF without decoding its body pages.
+
+    Section boundaries come from the PDF outline when it has one, otherwise from the Table of
+    Contents on the front pages, which is decoded page by page until it ends. doc_key is the PDF's
+    document_key when the caller already has it.
+
+    Returns:
+    - {"pages": selected page numbers, "toc_pages": Table of Contents pages}. The TOC pages are
+      decoded alongside the selection so control categories can still be named.
+    """
+    info = document_info(pdf_path, cache_path, doc_key)
+    last_page = info["page_count"] - 1
+    toc_pages, toc_entries = read_front_toc(pdf_path, cache_path, doc_key)
+    selected = set(parse_page_spec(pages, last_page)) if pages else set()
+    if sections:
+        entries = outline_sections(info["outline"]) or toc_entries
+        for section in sections:
+            selected.update(section_pages(entries, section, last_page))
+    return {"pages": sorted(selected), "toc_pages": toc_pages}
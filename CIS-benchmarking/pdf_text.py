@@ -0,0 +1,109 @@
+import os
+import time
+from collections import deque
+
+from instrumentation import stats
+
+# Pages handed to a worker at a time in multi-process mode
+BATCH_SIZE = 16
+
+
+def _extract_pages(pdf_path: str, page_numbers: list) -> list:
+    """
+    Worker: opens its own copy of the PDF and returns the text of the given pages.
+    """
+    import pymupdf  # PyMuPDF
+
+    with pymupdf.open(pdf_path) as doc:
+        return [doc.load_page(page_number).get_text("text") for page_number in page_numbers]
+
+
+def page_count(pdf_path: str) -> int:
+    import pymupdf  # PyMuPDF
+
+    with pymupdf.open(pdf_path) as doc:
+        return len(doc)
+
+
+def iter_page_texts(pdf_path: str, workers: int = 1, batch_size: int = BATCH_SIZE, page_numbers: list = None):
+    """
+    Yields (page_number, text) for every page in the PDF, or only the selected pages, in page order.
+
+    Only a bounded number of pages is held in memory at any time: serial mode decodes one page
+    per step, multi-process mode keeps at most two batches per worker in flight. Pages are
+    loaded on demand, so pages outside the selection are never decoded.
+
+    Parameters:
+    - pdf_path: Path to the benchmark PDF.
+    - workers: Number of processes to split the page range across. 1 (default) extracts serially,
+      0 or None uses one process per CPU.
+    - batch_size: Pages per worker task in multi-process mode.
+    - page_numbers: Optional 0-based page numbers to decode (e.g. from select_pages). Numbers
+      past the end of the document are ignored.
+    """
+    # PyMuPDF is imported where pages are decoded, so runs served from the cache never load it
+    import pymupdf  # PyMuPDF
+
+    if not workers:
+        workers = os.cpu_count() or 1
+
+    with pymupdf.open(pdf_path) as doc:
+        if page_numbers is None:
+            page_numbers = range(len(doc))
+        else:
+            page_numbers = sorted(page_number for page_number in set(page_numbers) if 0 <= page_number < len(doc))
+        if workers == 1 or len(page_numbers) < 2:
+            for page_number in page_numbers:
+                start = time.perf_counter()
+                text = doc.load_page(page_number).get_text("text")
+                stats.add_time("decode", time.perf_counter() - start)
+                stats.count("pages decoded")
+                yield page_number, text
+            return
+
+    from concurrent.futures import ProcessPoolExecutor
+
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = deque()
+        for start in range(0, len(page_numbers), batch_size):
+            batch = list(page_numbers[start:start + batch_size])
+            pending.append((batch, pool.submit(_extract_pages, pdf_path, batch)))
+            # Drain the oldest batch once enough work is queued, so results stay in page order
+            if len(pending) >= workers * 2:
+                yield from _drain(pending)
+        while pending:
+            yield from _drain(pending)
+
+
+def _drain(pending: deque):
+    # The decode stage is the time spent waiting on worker results
+    batch, future = pending.popleft()
+    with stats.span("decode"):
+        texts = future.result()
+    stats.count("pages decoded", len(texts))
+    yield from zip(batch, texts)
+
+
+def read_outline(pdf_path: str) -> list:
+    """
+    Returns the PDF's structured outline as [level, title, page] entries (pages are 1-based), or an
+    empty list when the PDF has none. No page content is decoded.
+    """
+    import pymupdf  # PyMuPDF
+
+    with stats.span("outline"), pymupdf.open(pdf_path) as doc:
+        return doc.get_toc(simple=True)
+
+
+def extract_page_texts(pdf_path: str, workers: int = 1) -> list:
+    """
+    Returns a list with the text of every page in the PDF, in page order.
+    """
+    return [text for _, text in iter_page_texts(pdf_path, workers)]
+
+
+def extract_text_from_pdf(pdf_path: str, workers: int = 1) -> str:
+    """
+    Returns the full text of the PDF, one newline-terminated block per page.
+    """
+    return "".join(text + "\n" for _, text in iter_page_texts(pdf_path, workers))
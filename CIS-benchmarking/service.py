@@ -0,0 +1,267 @@
+"""
+Local HTTP service that keeps extracted benchmarks warm in memory.
+
+Example:
+    python CIS-benchmarking/service.py --documents CIS-benchmarking/documents --port 8000
+
+    curl http://127.0.0.1:8000/benchmarks
+    curl "http://127.0.0.1:8000/benchmarks/ibm-aix-7.1-v2.1.0/controls?level=2&automation=automated"
+    curl http://127.0.0.1:8000/benchmarks/ibm-aix-7.1/controls/3.1.1.1    # latest IBM AIX 7.1 version
+    curl -X POST http://127.0.0.1:8000/benchmarks/ibm-aix-7.1-v2.1.0/extract
+    curl -X POST http://127.0.0.1:8000/benchmarks/refresh                 # pick up added or removed PDFs
+"""
+import argparse
+import logging
+import os
+import re
+import threading
+import time
+from collections import OrderedDict
+
+from starlette.applications import Starlette
+from starlette.concurrency import run_in_threadpool
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from cis_extract import _extract_benchmark, find_pdfs, parse_benchmark_name
+from page_cache import DEFAULT_CACHE_PATH
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Default folder of benchmark PDFs served
+DEFAULT_DOCUMENTS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "documents")
+
+# Extracted benchmarks kept in memory
+DEFAULT_CACHE_SIZE = 8
+
+
+def benchmark_id(benchmark: str, version: str = None) -> str:
+    # URL identifier of a benchmark (e.g., "IBM AIX 7.1", "v2.1.0" -> "ibm-aix-7.1-v2.1.0")
+    return "-".join(benchmark.lower().split() + ([version.lower()] if version else []))
+
+
+def version_key(version: str) -> tuple:
+    # Sort key of a benchmark version (e.g., "v2.10.0" -> (2, 10, 0)); "Unknown" sorts first
+    return tuple(int(number) for number in re.findall(r"\d+", version))
+
+
+class BenchmarkCatalog:
+    """
+    Benchmark PDFs found under a folder, keyed by benchmark id including the version, so every
+    version of a benchmark can be reached. The id without a version names the latest version.
+
+    The folder is searched once at start-up and then only on refresh() (POST /benchmarks/refresh,
+    or when a request names a benchmark that is not known yet), not on every request.
+    """
+
+    def __init__(self, documents_dir: str):
+        self.documents_dir = documents_dir
+        self.benchmarks = {}
+        self.latest = {}
+        self.lock = threading.Lock()
+        self.refresh()
+
+    def refresh(self) -> dict:
+        benchmarks = {}
+        for pdf_path in find_pdfs([self.documents_dir]):
+            benchmark, version = parse_benchmark_name(pdf_path)
+            key = benchmark_id(benchmark, version)
+            if key in benchmarks:
+                # The same benchmark and version in two files: tell them apart by file name
+                key = benchmark_id(os.path.splitext(os.path.basename(pdf_path))[0].replace("_", " "))
+            benchmarks[key] = {"benchmark": benchmark, "version": version, "file": pdf_path}
+        latest = {}
+        for key, info in benchmarks.items():
+            name = benchmark_id(info["benchmark"])
+            if name not in latest or version_key(info["version"]) > version_key(benchmarks[latest[name]]["version"]):
+                latest[name] = key
+        with self.lock:
+            self.benchmarks, self.latest = benchmarks, latest
+        return benchmarks
+
+    def get(self, name: str) -> dict:
+        """
+        Returns {"benchmark", "version", "file"} of a benchmark id, with or without its version
+        (e.g. "ibm-aix-7.1-v2.1.0" or "ibm-aix-7.1"), or None.
+        """
+        key = benchmark_id(name.replace("_", " ").replace("-", " "))
+        with self.lock:
+            info = self.benchmarks.get(key)
+            if info is None and key in self.latest:
+                info = self.benchmarks[self.latest[key]]
+        return info
+
+    def items(self) -> list:
+        with self.lock:
+            return list(self.benchmarks.items())
+
+
+class ExtractionCache:
+    """
+    Least-recently-used cache of extracted benchmarks, keyed by PDF path.
+
+    An entry is re-extracted when the PDF's modification time or size changed since it was
+    cached. Extractions run one at a time (PyMuPDF is not thread-safe), and concurrent requests
+    for a cold benchmark only extract it once.
+    """
+
+    def __init__(self, max_size: int = DEFAULT_CACHE_SIZE, cache_path: str = DEFAULT_CACHE_PATH):
+        self.max_size = max_size
+        self.cache_path = cache_path
+        self.entries = OrderedDict()
+        self.lock = threading.Lock()
+        self.extract_lock = threading.Lock()
+
+    def _lookup(self, pdf_path: str, signature: tuple) -> dict:
+        with self.lock:
+            entry = self.entries.get(pdf_path)
+            if entry is None or entry["signature"] != signature:
+                return None
+            self.entries.move_to_end(pdf_path)
+            return entry
+
+    def get(self, pdf_path: str, refresh: bool = False) -> dict:
+        """
+        Returns {"result", "seconds", "extracted_at", "signature"} for a PDF, extracting it on a
+        cache miss, when the file changed, or when refresh is set.
+        """
+        stat = os.stat(pdf_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if not refresh:
+            entry = self._lookup(pdf_path, signature)
+            if entry is not None:
+                return entry
+
+        with self.extract_lock:
+            # Another request may have extracted the file while this one waited for the lock
+            entry = None if refresh else self._lookup(pdf_path, signature)
+            if entry is None:
+                result, seconds = _extract_benchmark(pdf_path, self.cache_path)
+                result.pop("stats", None)
+                entry = {"result": result, "seconds": seconds, "extracted_at": time.time(), "signature": signature}
+                logging.info(f"Extracted {len(result['controls'])} controls from {os.path.basename(pdf_path)} in {seconds:.2f}s")
+                with self.lock:
+                    self.entries[pdf_path] = entry
+                    self.entries.move_to_end(pdf_path)
+                    while len(self.entries) > self.max_size:
+                        self.entries.popitem(last=False)
+        return entry
+
+    def __contains__(self, pdf_path: str) -> bool:
+        with self.lock:
+            return pdf_path in self.entries
+
+
+def control_json(control: dict, bodies=None) -> dict:
+    data = dict(control)
+    if bodies is not None:
+        data["body"] = bodies.fields(control["control_number"])
+        data["body_pages"] = bodies.page_span(control["control_number"])
+    return data
+
+
+def create_app(documents_dir: str = DEFAULT_DOCUMENTS_DIR, cache_size: int = DEFAULT_CACHE_SIZE,
+               cache_path: str = DEFAULT_CACHE_PATH) -> Starlette:
+    """
+    Builds the service. Benchmark PDFs are discovered under documents_dir at start-up; files added
+    or removed later are picked up by POST /benchmarks/refresh, or when a request names a
+    benchmark that is not known yet.
+    """
+    cache = ExtractionCache(cache_size, cache_path)
+    catalog = BenchmarkCatalog(documents_dir)
+
+    def not_found(message: str) -> JSONResponse:
+        return JSONResponse({"error": message}, status_code=404)
+
+    async def load(request, refresh: bool = False) -> tuple:
+        """
+        Returns (cache entry, None) for the benchmark named in the request, or (None, 404 response).
+        """
+        name = request.path_params["benchmark"]
+        info = catalog.get(name)
+        if info is None:
+            await run_in_threadpool(catalog.refresh)
+            info = catalog.get(name)
+        if info is None:
+            return None, not_found(f"Unknown benchmark '{name}'.")
+        try:
+            return await run_in_threadpool(cache.get, info["file"], refresh), None
+        except FileNotFoundError:
+            await run_in_threadpool(catalog.refresh)
+            return None, not_found(f"Benchmark file '{os.path.basename(info['file'])}' was removed.")
+
+    async def list_benchmarks(request):
+        return JSONResponse([
+            {"id": key, **info, "file": os.path.basename(info["file"]), "cached": info["file"] in cache}
+            for key, info in catalog.items()
+        ])
+
+    async def refresh_benchmarks(request):
+        benchmarks = await run_in_threadpool(catalog.refresh)
+        return JSONResponse({"benchmarks": len(benchmarks)})
+
+    async def list_controls(request):
+        entry, error = await load(request)
+        if error is not None:
+            return error
+        result = entry["result"]
+        level = request.query_params.get("level")
+        automation = request.query_params.get("automation")
+        category = request.query_params.get("category")
+        bodies = result["bodies"] if request.query_params.get("bodies") in ("1", "true", "yes") else None
+        controls = [
+            control_json(control, bodies) for control in result["controls"].values()
+            if (not level or control["profile"] == (level if level.lower().startswith("level") else f"Level {level}"))
+            and (not automation or control["automation_status"].lower() == automation.lower())
+            and (not category or category.lower() in control["category"].lower())
+        ]
+        return JSONResponse({"benchmark": result["benchmark"], "version": result["version"], "controls": controls})
+
+    async def get_control(request):
+        entry, error = await load(request)
+        if error is not None:
+            return error
+        result = entry["result"]
+        control = result["controls"].get(request.path_params["control"])
+        if control is None:
+            return not_found(f"Control '{request.path_params['control']}' not found in {result['benchmark']} {result['version']}.")
+        return JSONResponse({"benchmark": result["benchmark"], "version": result["version"], **control_json(control, result["bodies"])})
+
+    async def extract(request):
+        entry, error = await load(request, refresh=True)
+        if error is not None:
+            return error
+        return JSONResponse({
+            "benchmark": entry["result"]["benchmark"],
+            "version": entry["result"]["version"],
+            "controls": len(entry["result"]["controls"]),
+            "seconds": round(entry["seconds"], 3),
+        })
+
+    return Starlette(routes=[
+        Route("/benchmarks", list_benchmarks),
+        Route("/benchmarks/refresh", refresh_benchmarks, methods=["POST"]),
+        Route("/benchmarks/{benchmark}/controls", list_controls),
+        Route("/benchmarks/{benchmark}/controls/{control}", get_control),
+        Route("/benchmarks/{benchmark}/extract", extract, methods=["POST"]),
+    ])
+
+
+def main(argv: list = None) -> None:
+    parser = argparse.ArgumentParser(description="Serve extracted CIS controls over HTTP.")
+    parser.add_argument("--documents", default=DEFAULT_DOCUMENTS_DIR, help="Folder of benchmark PDFs (searched recursively)")
+    parser.add_argument("--host", default="127.0.0.1", help="Interface to listen on (default: 127.0.0.1)")
+    parser.add_argument("--port", type=int, default=8000, help="Port to listen on (default: 8000)")
+    parser.add_argument("--cache-size", type=int, default=DEFAULT_CACHE_SIZE, help="Extracted benchmarks kept in memory")
+    parser.add_argument("--no-cache", action="store_true", help="Do not use the on-disk page text cache")
+    args = parser.parse_args(argv)
+
+    import uvicorn
+
+    app = create_app(args.documents, args.cache_size, None if args.no_cache else DEFAULT_CACHE_PATH)
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The scripts import each other as top-level modules (e.g. "from cis_parser import ..."), as when
+# they are run from the CIS-benchmarking directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,33 @@
+import pytest
+
+from control_diff import MAX_CONTROL_PAGES, fingerprint_pages
+
+PAGES = [
+    "CIS Example Benchmark",
+    "1.1 Disable writesrv (Automated)\nProfile Applicability:\n• Level 1\nDescription:\nDisable writesrv.",
+    "Additional Information:\nRe-add the writesrv startup line to /etc/inittab.",
+    "1.2 Remove dt (Manual)\nProfile Applicability:\n• Level 2\nDescription:\nRemove the dt entry.",
+    "Additional Information:\nRe-add the dt entry.",
+]
+
+
+def test_fingerprint_pages_extend_each_run_of_selected_pages():
+    assert fingerprint_pages([1, 2, 40], 100) == list(range(1, 2 + MAX_CONTROL_PAGES)) + list(range(40, 40 + MAX_CONTROL_PAGES))
+    assert fingerprint_pages([3], 4) == [3, 4]
+
+
+def test_page_selection_ending_inside_a_control_keeps_its_fingerprint(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    from cis_extract import scan_benchmark
+
+    pdf_path = str(tmp_path / "CIS_Example_Benchmark_v1.0.0.pdf")
+    doc = pymupdf.open()
+    for text in PAGES:
+        doc.new_page().insert_text((72, 72), text)
+    doc.save(pdf_path)
+
+    full = {control["control_number"]: control["fingerprint"] for control in scan_benchmark(pdf_path, cache_path=None)["controls"]}
+    selected = scan_benchmark(pdf_path, cache_path=None, page_spec="1")["controls"]
+
+    assert [control["control_number"] for control in selected] == ["1.1"]
+    assert selected[0]["fingerprint"] == full["1.1"]
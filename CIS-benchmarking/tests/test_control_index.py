@@ -0,0 +1,41 @@
+import sqlite3
+from contextlib import closing
+
+import control_index
+from control_index import index_benchmark, open_index, search
+
+
+def result(version, name="Disable writesrv", partial=False):
+    controls = {
+        number: {"control_number": number, "control_name": f"{name} {number}", "category": "Services",
+                 "profile": "Level 1", "automation_status": "Automated", "page": 42}
+        for number in ("3.1.1.1", "3.1.1.2")
+    }
+    return {"benchmark": "IBM AIX 7.1", "version": version, "controls": controls, "bodies": None, "partial": partial}
+
+
+def indexed(conn):
+    return sorted((entry["version"], entry["control_number"], entry["control_name"]) for entry in search(conn))
+
+
+def test_versions_of_a_benchmark_are_indexed_side_by_side(tmp_path):
+    with closing(open_index(str(tmp_path / "index.sqlite"))) as conn:
+        index_benchmark(conn, result("v2.1.0"))
+        index_benchmark(conn, result("v2.2.0"))
+        index_benchmark(conn, result("v2.2.0", name="Remove"))
+
+        assert [version for version, _, _ in indexed(conn)] == ["v2.1.0", "v2.1.0", "v2.2.0", "v2.2.0"]
+        assert {name.split()[0] for version, _, name in indexed(conn) if version == "v2.2.0"} == {"Remove"}
+        assert len(search(conn, "writesrv")) == 2
+
+
+def test_index_with_one_version_per_benchmark_is_upgraded(tmp_path):
+    path = str(tmp_path / "index.sqlite")
+    with closing(sqlite3.connect(path)) as conn:
+        conn.executescript(control_index.SCHEMA.replace("UNIQUE (benchmark, version, control_number)", "UNIQUE (benchmark, control_number)"))
+        index_benchmark(conn, result("v2.1.0"))
+
+    with closing(open_index(path)) as conn:
+        index_benchmark(conn, result("v2.2.0"))
+        assert [version for version, _, _ in indexed(conn)] == ["v2.1.0", "v2.1.0", "v2.2.0", "v2.2.0"]
+        assert len(search(conn, "writesrv")) == 4
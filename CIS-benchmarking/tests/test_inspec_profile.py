@@ -0,0 +1,43 @@
+import os
+
+import pytest
+
+from inspec_profile import write_profile
+
+
+def result(benchmark, version, numbers=("1.1", "1.2")):
+    controls = {
+        number: {"control_number": number, "control_name": f"Control {number}", "automation_status": "Automated",
+                 "profile": "Level 1", "category": "Services"}
+        for number in numbers
+    }
+    return {"benchmark": benchmark, "version": version, "file": f"{benchmark} {version}.pdf", "controls": controls, "bodies": None}
+
+
+def control_files(profile_dir):
+    return sorted(os.listdir(os.path.join(profile_dir, "controls")))
+
+
+def test_versions_of_a_benchmark_get_their_own_control_files(tmp_path):
+    profile_dir = str(tmp_path / "profile")
+    results = [result("IBM AIX 7.1", "v2.1.0"), result("IBM AIX 7.1", "v2.2.0"), result("IBM AIX 7.2", "v1.0.0")]
+
+    assert write_profile(profile_dir, results)["written"] == 7
+    assert control_files(profile_dir) == [
+        "ibm-aix-7.1-v2.1.0-1.1_Control_1.1.rb", "ibm-aix-7.1-v2.1.0-1.2_Control_1.2.rb",
+        "ibm-aix-7.1-v2.2.0-1.1_Control_1.1.rb", "ibm-aix-7.1-v2.2.0-1.2_Control_1.2.rb",
+        "ibm-aix-7.2-1.1_Control_1.1.rb", "ibm-aix-7.2-1.2_Control_1.2.rb",
+    ]
+
+
+def test_single_benchmark_control_files_are_not_prefixed(tmp_path):
+    profile_dir = str(tmp_path / "profile")
+    write_profile(profile_dir, [result("IBM AIX 7.1", "v2.1.0")])
+    assert control_files(profile_dir) == ["1.1_Control_1.1.rb", "1.2_Control_1.2.rb"]
+
+
+def test_repeated_benchmark_version_is_rejected(tmp_path):
+    profile_dir = str(tmp_path / "profile")
+    with pytest.raises(ValueError, match="IBM AIX 7.1 v2.1.0 is extracted more than once"):
+        write_profile(profile_dir, [result("IBM AIX 7.1", "v2.1.0"), result("IBM AIX 7.1", "v2.1.0")])
+    assert not os.path.exists(profile_dir)
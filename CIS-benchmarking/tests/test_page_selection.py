@@ -0,0 +1,44 @@
+import pytest
+
+from page_selection import parse_page_ranges, parse_page_spec, select_pages
+
+
+def test_parse_page_ranges_closed_open_and_single():
+    assert parse_page_ranges("40-60, 75,300-") == [(40, 60), (75, 75), (300, None)]
+
+
+def test_parse_page_ranges_open_start():
+    assert parse_page_ranges("-5") == [(0, 5)]
+
+
+def test_parse_page_ranges_rejects_reversed_range():
+    with pytest.raises(ValueError, match="start is after end"):
+        parse_page_ranges("60-40")
+
+
+@pytest.mark.parametrize("spec", ["abc", "4-x", "1-2-3"])
+def test_parse_page_ranges_rejects_malformed_parts(spec):
+    with pytest.raises(ValueError, match="Invalid page selection"):
+        parse_page_ranges(spec)
+
+
+def test_parse_page_spec_open_range_ends_at_last_page():
+    assert parse_page_spec("300-", 304) == [300, 301, 302, 303, 304]
+
+
+def test_parse_page_spec_clamps_to_document():
+    assert parse_page_spec("8-20,2", 10) == [2, 8, 9, 10]
+    assert parse_page_spec("300-", 100) == []
+
+
+def test_select_pages_clamps_open_range_per_document(tmp_path):
+    pymupdf = pytest.importorskip("pymupdf")
+    pdf_path = str(tmp_path / "short.pdf")
+    doc = pymupdf.open()
+    for page_number in range(5):
+        doc.new_page().insert_text((72, 72), f"Page {page_number}")
+    doc.save(pdf_path)
+    doc.close()
+
+    assert select_pages(pdf_path, pages="3-", cache_path=None)["pages"] == [3, 4]
+    assert select_pages(pdf_path, pages="2-100", cache_path=None)["pages"] == [2, 3, 4]
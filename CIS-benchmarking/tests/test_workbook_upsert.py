@@ -0,0 +1,102 @@
+import pytest
+
+openpyxl = pytest.importorskip("openpyxl")
+
+from workbook_upsert import KEY_COLUMN, upsert_workbook
+
+
+def extracted_rows(benchmark, numbers, status="Automated"):
+    return [
+        {"Benchmark": benchmark, KEY_COLUMN: f"{number}_Control_{number}", "Automation Status": status}
+        for number in numbers
+    ]
+
+
+def read_rows(path):
+    worksheet = openpyxl.load_workbook(path).worksheets[0]
+    rows = list(worksheet.values)
+    return [dict(zip(rows[0], row)) for row in rows[1:]]
+
+
+def test_new_workbook_keeps_controls_of_each_benchmark(tmp_path):
+    path = str(tmp_path / "controls.xlsx")
+    rows = extracted_rows("IBM AIX 7.1", ["1.1", "1.2"]) + extracted_rows("IBM AIX 7.2", ["1.1", "1.2"])
+
+    counts = upsert_workbook(path, rows)
+
+    assert counts == {"updated": 0, "unchanged": 0, "appended": 4, "not_extracted": 0}
+    assert [row["Benchmark"] for row in read_rows(path)] == ["IBM AIX 7.1"] * 2 + ["IBM AIX 7.2"] * 2
+
+
+def test_upsert_updates_changed_rows_and_keeps_analyst_columns(tmp_path):
+    path = str(tmp_path / "controls.xlsx")
+    upsert_workbook(path, extracted_rows("IBM AIX 7.1", ["1.1", "1.2"]))
+    workbook = openpyxl.load_workbook(path)
+    workbook.worksheets[0].cell(row=1, column=4, value="Owner")
+    workbook.worksheets[0].cell(row=2, column=4, value="ops")
+    workbook.save(path)
+
+    rows = extracted_rows("IBM AIX 7.1", ["1.1"], status="Manual") + extracted_rows("IBM AIX 7.1", ["1.2", "1.3"])
+    counts = upsert_workbook(path, rows)
+
+    assert counts == {"updated": 1, "unchanged": 1, "appended": 1, "not_extracted": 0}
+    saved = read_rows(path)
+    assert [(row["Automation Status"], row["Owner"]) for row in saved] == [("Manual", "ops"), ("Automated", None), ("Automated", None)]
+
+
+def write_legacy_workbook(path, numbers):
+    workbook = openpyxl.Workbook()
+    workbook.active.append([KEY_COLUMN, "Automation Status"])
+    for number in numbers:
+        workbook.active.append([f"{number}_Control_{number}", "Automated"])
+    workbook.save(path)
+
+
+def test_legacy_workbook_rows_are_assigned_to_a_single_benchmark(tmp_path):
+    path = str(tmp_path / "legacy.xlsx")
+    write_legacy_workbook(path, ["1.1", "1.2"])
+
+    counts = upsert_workbook(path, extracted_rows("IBM AIX 7.1", ["1.1", "1.2"]))
+
+    assert counts == {"updated": 2, "unchanged": 0, "appended": 0, "not_extracted": 0}
+    assert [row["Benchmark"] for row in read_rows(path)] == ["IBM AIX 7.1", "IBM AIX 7.1"]
+
+
+def test_legacy_workbook_refuses_rows_of_several_benchmarks(tmp_path):
+    path = str(tmp_path / "legacy.xlsx")
+    write_legacy_workbook(path, ["1.1"])
+    rows = extracted_rows("IBM AIX 7.1", ["1.1"]) + extracted_rows("IBM AIX 7.2", ["1.1"])
+
+    with pytest.raises(ValueError, match="without a Benchmark"):
+        upsert_workbook(path, rows)
+
+
+def versioned_rows(version, numbers):
+    return [{**row, "Version": version} for row in extracted_rows("IBM AIX 7.1", numbers)]
+
+
+def test_versions_of_a_benchmark_are_kept_apart(tmp_path):
+    path = str(tmp_path / "controls.xlsx")
+    rows = versioned_rows("v2.1.0", ["1.1", "1.2"]) + versioned_rows("v2.2.0", ["1.1", "1.2"])
+
+    assert upsert_workbook(path, rows) == {"updated": 0, "unchanged": 0, "appended": 4, "not_extracted": 0}
+    assert upsert_workbook(path, rows) == {"updated": 0, "unchanged": 4, "appended": 0, "not_extracted": 0}
+    assert [row["Version"] for row in read_rows(path)] == ["v2.1.0", "v2.1.0", "v2.2.0", "v2.2.0"]
+
+
+def test_rows_without_a_version_are_assigned_to_a_single_version(tmp_path):
+    path = str(tmp_path / "controls.xlsx")
+    upsert_workbook(path, extracted_rows("IBM AIX 7.1", ["1.1", "1.2"]))
+
+    counts = upsert_workbook(path, versioned_rows("v2.1.0", ["1.1", "1.2"]))
+
+    assert counts == {"updated": 2, "unchanged": 0, "appended": 0, "not_extracted": 0}
+    assert [row["Version"] for row in read_rows(path)] == ["v2.1.0", "v2.1.0"]
+
+
+def test_rows_without_a_version_refuse_several_versions(tmp_path):
+    path = str(tmp_path / "controls.xlsx")
+    upsert_workbook(path, extracted_rows("IBM AIX 7.1", ["1.1"]))
+
+    with pytest.raises(ValueError, match="without a Benchmark or Version"):
+        upsert_workbook(path, versioned_rows("v2.1.0", ["1.1"]) + versioned_rows("v2.2.0", ["1.1"]))
@@ -0,0 +1,135 @@
+import logging
+import os
+
+from output_sinks import RowSink
+
+# Column identifying a control in every output workbook (e.g. "3.1.1.1_Disable_writesrv")
+KEY_COLUMN = "Inspec Profile Control Name"
+
+# Columns telling apart the controls of different benchmarks and versions, when a workbook has them
+SCOPE_COLUMNS = ("Benchmark", "Version")
+
+
+def control_key(row: dict, scope_columns: tuple = SCOPE_COLUMNS) -> tuple:
+    """
+    Upsert key of a row: its values of scope_columns (e.g. benchmark and version) followed by its
+    control number, taken from the Inspec Profile Control Name so renamed controls keep their row.
+    """
+    control_number = str(row.get(KEY_COLUMN) or "").split("_", 1)[0]
+    return (*(row.get(name) for name in scope_columns), control_number)
+
+
+def upsert_workbook(path: str, rows: list, output_path: str = None) -> dict:
+    """
+    Merges extracted rows into an existing workbook instead of rewriting it.
+
+    Rows are matched to the first worksheet's rows by control_key. For a matched control only the
+    extracted columns whose value changed are written; new controls are appended at the bottom.
+    Columns added by analysts (owner, exception status, notes, ...) and rows of controls that
+    were not extracted are left as they are. Extracted columns missing from the header are added
+    after the existing columns. A workbook that does not exist yet is created.
+
+    Rows are keyed by benchmark and version whenever the rows or the workbook have Benchmark and
+    Version columns, so the controls of several benchmarks and versions are kept apart. Rows of a
+    workbook written before it had one of these columns are matched to the extracted rows when a
+    single benchmark/version agrees with them, and get the column filled in.
+
+    Parameters:
+    - path: Workbook to update.
+    - rows: Extracted output rows (dicts keyed by column name).
+    - output_path: Where to save the result (default: path).
+
+    Returns:
+    - {"updated": n, "unchanged": n, "appended": n, "not_extracted": n} counted in controls.
+
+    Raises:
+    - ValueError: The workbook has rows without a Benchmark or Version and rows of several
+      benchmarks or versions are written that they could belong to.
+    """
+    from openpyxl import Workbook, load_workbook
+
+    if os.path.exists(path):
+        workbook = load_workbook(path)
+        worksheet = workbook.worksheets[0]
+        header = [cell.value for cell in worksheet[1]]
+    else:
+        workbook = Workbook()
+        worksheet = workbook.active
+        header = []
+
+    # Extracted columns missing from the workbook are added after the existing ones
+    columns = {name: index + 1 for index, name in enumerate(header) if name is not None}
+    for row in rows:
+        for name in row:
+            if name not in columns:
+                columns[name] = max(columns.values(), default=0) + 1
+                worksheet.cell(row=1, column=columns[name], value=name)
+
+    # Existing rows by control key (workbooks from older runs may list a control more than once)
+    scope_columns = tuple(name for name in SCOPE_COLUMNS if name in columns)
+    existing = {}
+    if KEY_COLUMN in columns:
+        for row_number in range(2, worksheet.max_row + 1):
+            values = {name: worksheet.cell(row=row_number, column=columns[name]).value for name in (*scope_columns, KEY_COLUMN)}
+            if values[KEY_COLUMN] is not None:
+                existing.setdefault(control_key(values, scope_columns), []).append(row_number)
+
+    # Rows missing a Benchmark or Version (written before the workbook had the column) belong to
+    # the extracted benchmark/version agreeing with the rest of their key, when there is only one
+    scopes = {control_key(row, scope_columns)[:-1] for row in rows}
+    for key in [key for key in existing if None in key[:-1]]:
+        matches = [scope for scope in scopes if all(value in (None, other) for value, other in zip(key, scope))]
+        if len(matches) > 1:
+            raise ValueError(
+                f"'{path}' has controls without a {' or '.join(scope_columns)}, so rows of {len(matches)} benchmark "
+                f"versions cannot be merged into it. Fill in those columns or upsert one benchmark version at a time."
+            )
+        if matches and matches[0] + key[-1:] != key:
+            existing.setdefault(matches[0] + key[-1:], []).extend(existing.pop(key))
+
+    counts = {"updated": 0, "unchanged": 0, "appended": 0, "not_extracted": 0}
+    seen = set()
+    for row in rows:
+        key = control_key(row, scope_columns)
+        seen.add(key)
+        row_numbers = existing.get(key)
+        if row_numbers is None:
+            row_number = worksheet.max_row + 1
+            for name, value in row.items():
+                worksheet.cell(row=row_number, column=columns[name], value=value)
+            existing[key] = [row_number]
+            counts["appended"] += 1
+            continue
+        changed = False
+        for row_number in row_numbers:
+            for name, value in row.items():
+                cell = worksheet.cell(row=row_number, column=columns[name])
+                if cell.value != value and not (cell.value is None and value in ("", None)):
+                    cell.value = value
+                    changed = True
+        counts["updated" if changed else "unchanged"] += 1
+    counts["not_extracted"] = sum(1 for key in existing if key not in seen)
+
+    workbook.save(output_path or path)
+    return counts
+
+
+class UpsertSink(RowSink):
+    """
+    Sink that merges the written rows into an existing workbook with upsert_workbook when closed.
+    The merge counts are kept in self.counts.
+    """
+
+    def _open(self) -> None:
+        self.rows = []
+        self.counts = None
+
+    def _write(self, values: list) -> None:
+        self.rows.append(dict(zip(self.columns, values)))
+
+    def _close(self) -> None:
+        self.counts = upsert_workbook(self.path, self.rows)
+        logging.info(
+            f"Upserted '{self.path}': {self.counts['updated']} controls updated, {self.counts['appended']} appended, "
+            f"{self.counts['unchanged']} unchanged, {self.counts['not_extracted']} not in this extraction."
+        )
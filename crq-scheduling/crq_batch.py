@@ -0,0 +1,260 @@
+"""
+Generates CRQ JSON files in bulk from a manifest instead of answering the prompts one CRQ at a time.
+
+Example:
+    python crq_batch.py patch-cycle.csv
+    python crq_batch.py patch-cycle.yaml --output-dir created-crqs --jobs 8 --report report.csv
+    python crq_batch.py patch-cycle.jsonl --dry-run
+
+Manifest fields (CSV header, YAML mapping keys or JSONL object keys, case-insensitive):
+    crq         CRQ number (e.g. CRQ000000913562)
+    purpose     Purpose of the deployment
+    cookbook    Chef cookbook name ("cookname" is accepted too)
+    servers     Server names, pasted text or a list; with --inventory, "@group" selectors too
+    recipes     Optional recipes of the cookbook (default: the cookbook itself)
+    emails      Optional additional email addresses (the default list is always included)
+    run_date, start_time, end_time
+                Optional schedule applied to every recipe (default: two hours starting in an
+                hour, moved to the next day rather than run past midnight)
+    schedules   Optional list of {"run_date", "start_time", "end_time", "recipes"}; in a CSV
+                manifest give it as JSON text
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+from concurrent.futures import ThreadPoolExecutor
+
+from crq_builder import _as_text, build_crq, default_schedule, write_crq
+from crq_scheduling import DEFAULT_DIRECTORY, DEFAULT_EMAILS, SERVER_INVENTORY, load_inventory
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Manifest keys accepted for a field besides its own name
+FIELD_ALIASES = {"cookname": "cookbook", "email": "emails", "server": "servers", "recipe": "recipes"}
+
+# Columns of the per-row report
+REPORT_COLUMNS = ["row", "crq", "status", "file", "error"]
+
+
+def manifest_yaml_loader():
+    """
+    Returns a PyYAML safe loader that reads unquoted times such as 22:00 as text. Plain YAML 1.1
+    reads them as base-60 integers (22:00 -> 1320).
+    """
+    import yaml
+
+    class ManifestLoader(yaml.SafeLoader):
+        pass
+
+    int_tag = "tag:yaml.org,2002:int"
+    ManifestLoader.yaml_implicit_resolvers = {
+        first: [(tag, regexp) for tag, regexp in resolvers if tag != int_tag]
+        for first, resolvers in yaml.SafeLoader.yaml_implicit_resolvers.items()
+    }
+    # YAML 1.1 integers without the base-60 form
+    ManifestLoader.add_implicit_resolver(
+        int_tag, re.compile(r"^(?:[-+]?0b[0-1_]+|[-+]?0[0-7_]+|[-+]?(?:0|[1-9][0-9_]*)|[-+]?0x[0-9a-fA-F_]+)$"),
+        list("-+0123456789"),
+    )
+    return ManifestLoader
+
+
+def load_manifest(path: str) -> list:
+    """
+    Reads a CSV, YAML or JSONL manifest of CRQs.
+
+    Returns:
+    - A list of (row_number, row, error) tuples: row is a dict of the row's fields, or None when the
+      row could not be parsed, in which case error says why. Row numbers are the CSV/JSONL line
+      numbers and the 1-based position of YAML entries.
+    """
+    extension = os.path.splitext(path)[1].lower()
+    rows = []
+    if extension == ".csv":
+        with open(path, newline='', encoding='utf-8-sig') as f:
+            reader = csv.DictReader(f)
+            for row in reader:
+                rows.append((reader.line_num, row, None))
+    elif extension in (".yaml", ".yml"):
+        try:
+            import yaml
+        except ImportError:
+            raise ImportError("YAML manifests require PyYAML (pip install pyyaml).")
+        with open(path, encoding='utf-8') as f:
+            data = yaml.load(f, Loader=manifest_yaml_loader()) or []
+        if isinstance(data, dict):
+            data = data.get("crqs", [])
+        for number, row in enumerate(data, start=1):
+            if isinstance(row, dict):
+                rows.append((number, row, None))
+            else:
+                rows.append((number, None, "Entry is not a mapping of CRQ fields."))
+    elif extension in (".jsonl", ".ndjson"):
+        with open(path, encoding='utf-8') as f:
+            for number, line in enumerate(f, start=1):
+                if not line.strip():
+                    continue
+                try:
+                    row = json.loads(line)
+                except ValueError as e:
+                    rows.append((number, None, f"Invalid JSON: {e}"))
+                    continue
+                if isinstance(row, dict):
+                    rows.append((number, row, None))
+                else:
+                    rows.append((number, None, "Line is not a JSON object of CRQ fields."))
+    else:
+        raise ValueError(f"Unsupported manifest format '{extension}' (use .csv, .yaml, .yml or .jsonl).")
+    return rows
+
+
+def normalize_row(row: dict) -> dict:
+    # Lowercases the field names and maps aliases (e.g. "Cookname" -> "cookbook")
+    normalized = {}
+    for key, value in row.items():
+        if key is None:
+            continue
+        key = key.strip().lower().replace(" ", "_")
+        normalized[FIELD_ALIASES.get(key, key)] = value
+    return normalized
+
+
+def row_to_crq(row: dict, inventory=None) -> dict:
+    """
+    Builds the CRQ document of one manifest row with crq_builder.build_crq.
+
+    A "schedules" list (JSON text in a CSV cell) is used as given; otherwise the row's
+    run_date/start_time/end_time, or the defaults for those left empty, apply to every recipe.
+    With an inventory, servers are validated against it and "@group" selectors are expanded.
+
+    Raises:
+    - ValueError (CRQValidationError) listing every problem found in the row.
+    """
+    row = normalize_row(row)
+    schedules = row.get("schedules")
+    if isinstance(schedules, str):
+        try:
+            schedules = json.loads(schedules) if schedules.strip() else None
+        except ValueError as e:
+            raise ValueError(f"Invalid schedules JSON: {e}")
+    if schedules is not None and not isinstance(schedules, list):
+        raise ValueError("schedules must be a list of {run_date, start_time, end_time, recipes}.")
+
+    # A row without a schedule gets build_crq's default; one with only some fields set is
+    # completed from the default and checked
+    schedule = tuple(_as_text(row.get(key)).strip() for key in ("run_date", "start_time", "end_time"))
+    if any(schedule):
+        schedule = tuple(value or default for value, default in zip(schedule, default_schedule()))
+    else:
+        schedule = None
+    return build_crq(
+        row.get("crq"), row.get("purpose"), row.get("cookbook"), row.get("servers"), recipes=row.get("recipes"),
+        emails=row.get("emails"), schedule=schedule, schedules=schedules, default_emails=DEFAULT_EMAILS,
+        inventory=inventory,
+    )
+
+
+def process_row(row_number: int, row: dict, error: str, output_dir: str, dry_run: bool = False,
+                inventory=None) -> dict:
+    """
+    Worker: builds and writes the CRQ of one manifest row. Failures are returned in the report entry
+    instead of raised, so one bad row does not stop the batch.
+    """
+    crq = _as_text(normalize_row(row).get("crq")).strip() if row is not None else ""
+    report = {"row": row_number, "crq": crq, "status": "error", "file": "", "error": error or ""}
+    if error or row is None:
+        return report
+    try:
+        json_data = row_to_crq(row, inventory)
+        if dry_run:
+            report.update(status="valid", error="")
+            return report
+        file_path = write_crq(json_data, output_dir)
+        report.update(status="written", file=file_path, error="")
+    except Exception as e:
+        report["error"] = str(e)
+    return report
+
+
+def run_batch(rows: list, output_dir: str = DEFAULT_DIRECTORY, jobs: int = None, dry_run: bool = False,
+              inventory=None) -> list:
+    """
+    Processes manifest rows (as returned by load_manifest) across a worker pool.
+
+    A CRQ listed on more than one row is only generated from its first row; later rows are
+    reported as duplicates instead of silently overwriting its file. With an inventory (a
+    ServerInventory), rows with unknown servers or groups are reported as errors.
+
+    Returns:
+    - One report entry per row, in manifest order (see REPORT_COLUMNS).
+    """
+    first_rows = {}
+    tasks = []
+    for row_number, row, error in rows:
+        if row is not None:
+            crq = _as_text(normalize_row(row).get("crq")).strip()
+            if crq and crq in first_rows:
+                error = f"Duplicate CRQ {crq} (first listed on row {first_rows[crq]})."
+            elif crq:
+                first_rows[crq] = row_number
+        tasks.append((row_number, row, error))
+
+    if not dry_run:
+        os.makedirs(output_dir, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=jobs) as pool:
+        futures = [pool.submit(process_row, row_number, row, error, output_dir, dry_run, inventory) for row_number, row, error in tasks]
+        return [future.result() for future in futures]
+
+
+def write_report(path: str, reports: list) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as f:
+        writer = csv.DictWriter(f, fieldnames=REPORT_COLUMNS)
+        writer.writeheader()
+        writer.writerows(reports)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Generate CRQ JSON files in bulk from a CSV, YAML or JSONL manifest.")
+    parser.add_argument("manifest", help="Manifest of CRQs (.csv, .yaml/.yml or .jsonl)")
+    parser.add_argument("-o", "--output-dir", default=DEFAULT_DIRECTORY, help="Directory the CRQ JSON files are saved to")
+    parser.add_argument("-j", "--jobs", type=int, default=None, help="Worker threads (default: Python's thread pool default)")
+    parser.add_argument("--report", help="Per-row report CSV (default: <output-dir>/crq_batch_report.csv)")
+    parser.add_argument("--dry-run", action="store_true", help="Validate every row without writing any file")
+    parser.add_argument("--inventory", default=SERVER_INVENTORY, help="Server inventory (.csv, .json or .sqlite) to validate servers and expand @group selectors against (default: SERVER_INVENTORY in secrets.py)")
+    args = parser.parse_args(argv)
+
+    try:
+        rows = load_manifest(args.manifest)
+    except (OSError, ValueError, ImportError) as e:
+        logging.error(f"Failed to read manifest: {e}")
+        return 1
+    try:
+        inventory = load_inventory(args.inventory)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logging.error(f"Failed to load server inventory: {e}")
+        return 1
+
+    reports = run_batch(rows, args.output_dir, args.jobs, args.dry_run, inventory)
+    for report in reports:
+        if report["status"] == "error":
+            logging.error(f"Row {report['row']} ({report['crq'] or 'no CRQ'}): {report['error']}")
+
+    report_path = args.report or (None if args.dry_run else os.path.join(args.output_dir, "crq_batch_report.csv"))
+    if report_path:
+        write_report(report_path, reports)
+        logging.info(f"Report saved: {report_path}")
+
+    failed = sum(1 for report in reports if report["status"] == "error")
+    done = "validated" if args.dry_run else "written"
+    logging.info(f"{len(reports) - failed} of {len(reports)} CRQs {done}, {failed} failed.")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
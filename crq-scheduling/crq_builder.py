@@ -0,0 +1,308 @@
+"""
+Prompt-free API for building CRQ scheduling documents, for tools that generate CRQs in-process
+instead of driving crq_scheduling.py through its prompts.
+
+Example:
+    from crq_builder import build_crq, write_crq
+
+    crq = build_crq(
+        "CRQ000000913562", "Monthly AIX patching", "aix_patch", "abcprddb01 abcprdap02",
+        recipes=["install", "verify"], schedule=("12/11/2025", "22:00", "23:30"),
+        default_emails=["ops-team@example.com"],
+    )
+    write_crq(crq, "created-crqs")
+"""
+import json
+import logging
+import os
+import re
+from datetime import datetime, timedelta
+
+# The naming convention and selector patterns live with the tokenizer and are imported here for
+# scripts that import them from this module
+from server_tokenizer import SELECTOR_PATTERN, SERVER_NAME_PATTERN, convention_tokenizer
+
+# CRQ numbers look like "CRQ000000913562"
+CRQ_PATTERN = re.compile(r"^CRQ\d+$")
+
+# Separators between items of pasted input (emails, recipes)
+SEPARATOR_PATTERN = re.compile(r'[,;\t ]+')
+
+DATE_FORMAT = "%d/%m/%Y"
+TIME_FORMAT = "%H:%M"
+
+# Shortest deployment window accepted, in seconds
+MIN_WINDOW_SECONDS = 3600
+
+
+class CRQValidationError(ValueError):
+    """
+    Raised by build_crq with every problem found in its arguments (in self.errors).
+    """
+
+    def __init__(self, errors: list):
+        super().__init__(" ".join(errors))
+        self.errors = errors
+
+
+def _as_text(value) -> str:
+    # Lists are joined so they go through the same cleaning as pasted text
+    if value is None:
+        return ""
+    if isinstance(value, (list, tuple)):
+        return " ".join(str(item) for item in value)
+    return str(value)
+
+
+def clean_input(input_string: str, default_list: list = None, to_lowercase: bool = False) -> list:
+    if default_list is None:
+        default_list = []
+    cleaned_list = SEPARATOR_PATTERN.split(input_string.strip())
+    cleaned_list = [item.strip().strip('"').strip("'") for item in cleaned_list if item.strip()]
+    if to_lowercase:
+        cleaned_list = [item.lower() for item in cleaned_list]
+    seen = set()
+    return [item for item in default_list + cleaned_list if not (item in seen or seen.add(item))]
+
+
+def clean_servers(input_string: str, naming_pattern: str = SERVER_NAME_PATTERN, inventory=None) -> list:
+    """
+    Cleans and splits server input based on the organization's naming convention.
+    Extracts server names matching the provided regex pattern, also when they are concatenated
+    or pasted from spreadsheet columns (see server_tokenizer.py).
+
+    Parameters:
+    - input_string: Raw input containing server names.
+    - naming_pattern: Regex pattern a server name (letters followed by digits) must match.
+    - inventory: Optional ServerInventory (see server_inventory.py). When given, group selectors
+      such as "@aix-prod" are expanded and names missing from the inventory are logged as
+      warnings and left out (see resolve_servers).
+
+    Returns:
+    - A list of valid server names.
+    """
+    if inventory is not None:
+        servers, unknown, unknown_groups = resolve_servers(input_string, inventory, naming_pattern)
+        for selector in unknown_groups:
+            logging.warning(f"Unknown server group '{selector}' ignored.")
+        if unknown:
+            logging.warning(f"Servers not in the inventory ignored: {', '.join(describe_unknown(unknown, inventory, naming_pattern))}")
+        return servers
+
+    # Split the input into server names, skipping group selectors (there is no inventory to expand them)
+    servers = convention_tokenizer(naming_pattern).tokenize(input_string)
+    # Remove duplicates while preserving order
+    seen = set()
+    return [server for server in servers if not (server[0] == "@" or server in seen or seen.add(server))]
+
+
+def resolve_servers(input_string: str, inventory, naming_pattern: str = SERVER_NAME_PATTERN) -> tuple:
+    """
+    Validates server input against a ServerInventory, expanding group selectors in place.
+
+    Parameters:
+    - input_string: Raw input containing server names and "@group" selectors.
+    - inventory: ServerInventory the names are checked against.
+    - naming_pattern: Regex pattern a server name (letters followed by digits) must match.
+
+    Returns:
+    - (servers, unknown, unknown_groups): the known servers, including the hosts of every
+      selector, de-duplicated in input order; the names that are not in the inventory, as
+      written (a mistyped "abcprddb012" is never read as "abcprddb01", see describe_unknown);
+      and the selectors that name no group or tag.
+    """
+    servers, unknown, unknown_groups = [], [], []
+    seen = set()
+    for token in inventory.tokenizer(naming_pattern).tokenize(input_string):
+        if token.startswith("@"):
+            try:
+                names = inventory.expand(token)
+            except KeyError:
+                unknown_groups.append(token)
+                continue
+        elif token in inventory:
+            names = [token]
+        else:
+            if token not in unknown:
+                unknown.append(token)
+            continue
+        servers.extend(name for name in names if not (name in seen or seen.add(name)))
+    return servers, unknown, unknown_groups
+
+
+def describe_unknown(unknown: list, inventory, naming_pattern: str = SERVER_NAME_PATTERN) -> list:
+    """
+    Returns the unknown names of resolve_servers for messages, with the inventory host each one
+    holds as a suggestion to confirm (e.g. "abcprddb012 (did you mean abcprddb01?)").
+    """
+    suggestion = inventory.tokenizer(naming_pattern).suggestion
+    described = []
+    for name in unknown:
+        host = suggestion(name)
+        described.append(f"{name} (did you mean {host}?)" if host else name)
+    return described
+
+
+def clean_recipes(input_string: str, cookname: str) -> list:
+    """
+    Cleans and processes recipe input to generate a list of recipes in JSON format.
+    Each recipe is prefixed by the provided cookbook name (cookname) unless it already is
+    (e.g. "aix_patch::install"). If no specific recipes are provided, defaults to just the cookname.
+    """
+    if not input_string.strip():
+        return [cookname]  # Default to cookname if no recipes are specified
+    recipes = SEPARATOR_PATTERN.split(input_string.strip())
+    recipes = [recipe.strip() for recipe in recipes if recipe.strip()]
+    return [recipe if recipe == cookname or "::" in recipe else f"{cookname}::{recipe}" for recipe in recipes]
+
+
+def validate_json(data: dict) -> bool:
+    try:
+        json.dumps(data)
+        return True
+    except (TypeError, ValueError) as e:
+        logging.error(f"JSON validation error: {e}")
+        return False
+
+
+def default_schedule(now: datetime = None) -> tuple:
+    """
+    Returns the default (run_date, start_time, end_time): a two-hour window starting an hour from
+    now. A schedule cannot run past midnight, so a window that would is moved to start at 00:00
+    the next day.
+    """
+    start = (now or datetime.now()) + timedelta(hours=1)
+    end = start + timedelta(hours=2)
+    if end.date() != start.date():
+        start = datetime.combine(end.date(), datetime.min.time())
+        end = start + timedelta(hours=2)
+    return start.strftime(DATE_FORMAT), start.strftime(TIME_FORMAT), end.strftime(TIME_FORMAT)
+
+
+def check_schedule(run_date: str, start_time: str, end_time: str) -> None:
+    """
+    Raises ValueError when a schedule's date (DD/MM/YYYY) or times (HH:MM) are malformed, or when
+    it ends less than an hour after it starts.
+    """
+    try:
+        datetime.strptime(run_date, DATE_FORMAT)
+    except ValueError:
+        raise ValueError(f"Invalid run date '{run_date}'. Use DD/MM/YYYY.")
+    try:
+        start_dt = datetime.strptime(f"{run_date} {start_time}", f"{DATE_FORMAT} {TIME_FORMAT}")
+        end_dt = datetime.strptime(f"{run_date} {end_time}", f"{DATE_FORMAT} {TIME_FORMAT}")
+    except ValueError:
+        raise ValueError(f"Invalid start/end time '{start_time}'/'{end_time}'. Use HH:MM.")
+    if (end_dt - start_dt).total_seconds() < MIN_WINDOW_SECONDS:
+        raise ValueError(f"End time {end_time} must be at least 1 hour after start time {start_time}.")
+
+
+def recipe_schedules(recipes: list, schedule: tuple = None) -> list:
+    """
+    Schedules every recipe on its own with the same (run_date, start_time, end_time), like
+    answering "use the default schedule" for each recipe in the prompts. A given schedule is
+    checked with check_schedule; the default one is valid by construction.
+    """
+    if schedule:
+        check_schedule(*schedule)
+    run_date, start_time, end_time = schedule or default_schedule()
+    return [
+        {"run_date": run_date, "start_time": start_time, "end_time": end_time, "recipes": [recipe]}
+        for recipe in recipes
+    ]
+
+
+def build_crq(crq: str, purpose: str, cookname: str, servers, recipes=None, emails=None,
+              schedule: tuple = None, schedules: list = None, default_emails: list = None, inventory=None) -> dict:
+    """
+    Builds a CRQ document, shaped exactly like the JSON written by the interactive script, without
+    prompting or touching the filesystem.
+
+    Parameters:
+    - crq: CRQ number (e.g. "CRQ000000913562").
+    - purpose: Purpose of the deployment.
+    - cookname: Chef cookbook name.
+    - servers: Server names, as pasted text or a list (cleaned with clean_servers).
+    - recipes: Optional recipes, as text or a list (default: the cookbook itself).
+    - emails: Optional additional email addresses, as text or a list.
+    - schedule: Optional (run_date, start_time, end_time) given to every recipe (default:
+      default_schedule, two hours starting an hour from now).
+    - schedules: Optional explicit schedules instead, each {"run_date", "start_time", "end_time",
+      "recipes"}; a schedule without recipes covers every recipe.
+    - default_emails: Addresses always notified, listed before the additional ones.
+    - inventory: Optional ServerInventory. Servers must then be known to it, and "@group"
+      selectors are expanded into their hosts.
+
+    Returns:
+    - The CRQ document.
+
+    Raises:
+    - CRQValidationError listing every problem found.
+    """
+    errors = []
+    crq = _as_text(crq).strip()
+    if not CRQ_PATTERN.match(crq):
+        errors.append(f"Invalid CRQ format '{crq}'.")
+    purpose = _as_text(purpose).strip()
+    if not purpose:
+        errors.append("Missing purpose.")
+    cookname = _as_text(cookname).strip()
+    if not cookname:
+        errors.append("Missing cookbook.")
+
+    unknown, unknown_groups = [], []
+    if inventory is not None:
+        server_list, unknown, unknown_groups = resolve_servers(_as_text(servers), inventory)
+    else:
+        server_list = clean_servers(_as_text(servers))
+    if unknown_groups:
+        errors.append(f"Unknown server groups: {', '.join(unknown_groups)}.")
+    if unknown:
+        errors.append(f"Servers not in the inventory: {', '.join(describe_unknown(unknown, inventory))}.")
+    if not server_list and not (unknown or unknown_groups):
+        errors.append("No valid server names.")
+
+    recipe_list = clean_recipes(_as_text(recipes), cookname)
+    email_list = clean_input(_as_text(emails), default_list=list(default_emails or []))
+
+    built_schedules = []
+    try:
+        if schedules:
+            for item in schedules:
+                if not isinstance(item, dict):
+                    raise ValueError("Every schedule must be a mapping of run_date, start_time, end_time and recipes.")
+                run_date, start_time, end_time = (_as_text(item.get(key)).strip() for key in ("run_date", "start_time", "end_time"))
+                check_schedule(run_date, start_time, end_time)
+                item_recipes = clean_recipes(_as_text(item.get("recipes")), cookname) if item.get("recipes") else recipe_list
+                built_schedules.append({"run_date": run_date, "start_time": start_time, "end_time": end_time, "recipes": item_recipes})
+        else:
+            built_schedules = recipe_schedules(recipe_list, schedule)
+    except ValueError as e:
+        errors.append(str(e))
+
+    if errors:
+        raise CRQValidationError(errors)
+
+    json_data = {
+        "CRQ": crq,
+        "purpose": purpose,
+        "type": "cookbook",
+        "cookname": cookname,
+        "email": ",".join(email_list),
+        "servers": server_list,
+        "schedules": built_schedules
+    }
+    if not validate_json(json_data):
+        raise CRQValidationError(["Generated JSON is invalid."])
+    return json_data
+
+
+def write_crq(json_data: dict, directory: str) -> str:
+    """
+    Saves a CRQ document as <directory>/<CRQ>.json and returns the file path.
+    """
+    os.makedirs(directory, exist_ok=True)
+    file_path = os.path.join(directory, f"{json_data['CRQ']}.json")
+    with open(file_path, 'w') as json_file:
+        json.dump(json_data, json_file, indent=4)
+    return file_path
@@ -0,0 +1,254 @@
+"""
+Local server inventory index, used to validate server names and expand group selectors in CRQs.
+
+The index is loaded from a CSV or JSON inventory export, or from an SQLite file saved from one:
+    python server_inventory.py inventory-export.csv --save inventory.sqlite
+    python server_inventory.py inventory.sqlite --expand @aix-prod
+    python server_inventory.py inventory.sqlite --check "abcprddb01 abcprdap99 @aix-uat"
+
+Export format: one host per row (CSV) or object (JSON list, or {"hosts": [...]}), with a host name
+column ("hostname", "host", "server" or "name") and any of the tag columns below. Every value of a
+tag column becomes a tag of the host, and "groups" holds extra group names separated by commas,
+semicolons or spaces (or a JSON list).
+
+Selectors:
+    @prod           hosts tagged "prod" (an environment, role, platform, ... or group name)
+    @aix-prod       a group named "aix-prod" if there is one, otherwise hosts tagged both "aix" and "prod"
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import re
+import sqlite3
+import sys
+import time
+from contextlib import closing
+
+from server_tokenizer import SERVER_NAME_PATTERN, ServerTokenizer
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Columns holding the host name, in order of preference
+HOST_COLUMNS = ("hostname", "host", "server", "name")
+
+# Columns whose values become tags of the host
+TAG_COLUMNS = ("environment", "env", "role", "platform", "os", "location", "site", "application", "app")
+
+# Columns holding lists of group names
+GROUP_COLUMNS = ("groups", "group", "tags")
+
+# Separators inside a group list cell, and runs of spaces inside a tag
+GROUP_SEPARATOR_PATTERN = re.compile(r"[,;\s]+")
+WHITESPACE_PATTERN = re.compile(r"\s+")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS hosts (
+    name TEXT PRIMARY KEY
+);
+CREATE TABLE IF NOT EXISTS tags (
+    tag TEXT PRIMARY KEY,
+    names TEXT NOT NULL
+);
+"""
+
+
+def normalize_name(value: str) -> str:
+    # Host names and tags are matched case-insensitively; hosts without their domain (FQDN -> short name)
+    return str(value).strip().lower()
+
+
+def normalize_host(value: str) -> str:
+    return normalize_name(value).split(".", 1)[0]
+
+
+def normalize_tag(value: str) -> str:
+    # Spaces inside a tag become dashes so it can be written in a selector ("AIX Prod" -> "aix-prod")
+    return WHITESPACE_PATTERN.sub("-", normalize_name(value))
+
+
+class ServerInventory:
+    """
+    In-memory index of known hosts and their tags.
+
+    Host names are kept in a set, so validating a name is a single hash lookup regardless of the
+    fleet size, and every tag maps to a frozenset of its hosts, so a selector is expanded with at
+    most a few set intersections.
+    """
+
+    def __init__(self, hosts: set = None, tags: dict = None):
+        self.hosts = set(hosts or ())
+        self.tags = {tag: frozenset(names) for tag, names in (tags or {}).items()}
+        self._tokenizers = {}
+
+    def __contains__(self, name: str) -> bool:
+        return normalize_host(name) in self.hosts
+
+    def __len__(self) -> int:
+        return len(self.hosts)
+
+    @classmethod
+    def from_records(cls, records) -> "ServerInventory":
+        """
+        Builds the index from inventory rows (dicts), e.g. csv.DictReader rows or parsed JSON objects.
+        Rows without a host name are skipped.
+        """
+        hosts = set()
+        tags = {}
+        # Every row of an export has the same columns and only a handful of distinct tag values, so
+        # each header and value is normalized once
+        columns = {}
+        tag_names = {}
+
+        def tag_name(value):
+            tag = tag_names.get(value)
+            if tag is None:
+                tag = tag_names[value] = normalize_tag(value)
+            return tag
+
+        for record in records:
+            record = {
+                columns.get(key) or columns.setdefault(key, normalize_name(key)): value
+                for key, value in record.items() if key is not None
+            }
+            name = next((record[column] for column in HOST_COLUMNS if record.get(column)), None)
+            if not name:
+                continue
+            host = normalize_host(name)
+            hosts.add(host)
+            host_tags = {tag_name(record[column]) for column in TAG_COLUMNS if record.get(column)}
+            for column in GROUP_COLUMNS:
+                groups = record.get(column)
+                if isinstance(groups, str):
+                    groups = GROUP_SEPARATOR_PATTERN.split(groups)
+                host_tags.update(tag_name(group) for group in groups or () if str(group).strip())
+            for tag in host_tags:
+                tags.setdefault(tag, set()).add(host)
+        return cls(hosts, tags)
+
+    @classmethod
+    def load(cls, path: str) -> "ServerInventory":
+        """
+        Loads an inventory from a CSV or JSON export, or from an SQLite file written by save().
+        """
+        extension = os.path.splitext(path)[1].lower()
+        if extension == ".csv":
+            with open(path, newline='', encoding='utf-8-sig') as f:
+                return cls.from_records(csv.DictReader(f))
+        if extension == ".json":
+            with open(path, encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                data = data.get("hosts", [])
+            return cls.from_records(record for record in data if isinstance(record, dict))
+        if extension in (".sqlite", ".db"):
+            if not os.path.exists(path):
+                raise FileNotFoundError(f"Inventory '{path}' not found.")
+            with closing(sqlite3.connect(path)) as conn:
+                hosts = {name for (name,) in conn.execute("SELECT name FROM hosts")}
+                tags = {tag: names.split("\n") for tag, names in conn.execute("SELECT tag, names FROM tags")}
+            return cls(hosts, tags)
+        raise ValueError(f"Unsupported inventory format '{extension}' (use .csv, .json or .sqlite).")
+
+    def save(self, path: str) -> None:
+        """
+        Writes the index to an SQLite file, replacing its previous content, so later runs load the
+        parsed index instead of re-reading the export. The hosts of a tag are stored together in
+        one newline-separated value, which loads far faster than one row per host and tag.
+        """
+        with closing(sqlite3.connect(path)) as conn, conn:
+            conn.executescript(SCHEMA)
+            conn.execute("DELETE FROM hosts")
+            conn.execute("DELETE FROM tags")
+            conn.executemany("INSERT INTO hosts (name) VALUES (?)", ((name,) for name in self.hosts))
+            conn.executemany(
+                "INSERT INTO tags (tag, names) VALUES (?, ?)",
+                ((tag, "\n".join(sorted(names))) for tag, names in self.tags.items()),
+            )
+
+    def tokenizer(self, naming_pattern: str = SERVER_NAME_PATTERN) -> ServerTokenizer:
+        """
+        Returns a ServerTokenizer that recognizes this inventory's hosts inside glued text, built on
+        first use.
+        """
+        tokenizer = self._tokenizers.get(naming_pattern)
+        if tokenizer is None:
+            tokenizer = self._tokenizers[naming_pattern] = ServerTokenizer(naming_pattern, self.hosts)
+        return tokenizer
+
+    def _split_selector(self, parts: list) -> list:
+        # Splits dash-separated selector parts into known tags, longest tag first (e.g.
+        # ["rhel", "9", "prod"] -> ["rhel-9", "prod"] when "rhel-9" is a tag), or None
+        if not parts:
+            return []
+        for length in range(len(parts), 0, -1):
+            tag = "-".join(parts[:length])
+            if tag in self.tags:
+                rest = self._split_selector(parts[length:])
+                if rest is not None:
+                    return [tag] + rest
+        return None
+
+    def expand(self, selector: str) -> list:
+        """
+        Returns the sorted hosts selected by a group selector (with or without the leading "@").
+
+        Raises:
+        - KeyError when the selector names no known group or combination of tags.
+        """
+        name = normalize_tag(selector.lstrip("@"))
+        tags = self._split_selector(name.split("-")) if name else None
+        if not tags:
+            raise KeyError(selector)
+        selected = self.tags[tags[0]]
+        for tag in tags[1:]:
+            selected = selected & self.tags[tag]
+        return sorted(selected)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Build and query the local server inventory index.")
+    parser.add_argument("inventory", help="Inventory export (.csv or .json) or saved index (.sqlite)")
+    parser.add_argument("--save", metavar="PATH", help="Save the index to this SQLite file")
+    parser.add_argument("--expand", metavar="SELECTOR", help="Print the hosts of a group selector (e.g. @aix-prod)")
+    parser.add_argument("--check", metavar="SERVERS", help="Validate pasted server names and selectors, listing unknown ones")
+    parser.add_argument("--groups", action="store_true", help="List every tag and group with its host count")
+    args = parser.parse_args(argv)
+
+    start = time.perf_counter()
+    try:
+        inventory = ServerInventory.load(args.inventory)
+    except (OSError, ValueError, sqlite3.Error) as e:
+        logging.error(f"Failed to load inventory: {e}")
+        return 1
+    logging.info(f"Loaded {len(inventory)} hosts and {len(inventory.tags)} tags in {time.perf_counter() - start:.2f}s.")
+
+    if args.save:
+        inventory.save(args.save)
+        logging.info(f"Inventory index saved: {args.save}")
+    if args.groups:
+        for tag in sorted(inventory.tags):
+            print(f"@{tag:<30} {len(inventory.tags[tag])}")
+    if args.expand:
+        try:
+            print("\n".join(inventory.expand(args.expand)))
+        except KeyError:
+            logging.error(f"Unknown server group '{args.expand}'.")
+            return 1
+    if args.check:
+        from crq_builder import describe_unknown, resolve_servers
+
+        servers, unknown, unknown_groups = resolve_servers(args.check, inventory)
+        print(f"{len(servers)} known server(s): {' '.join(servers)}")
+        for selector in unknown_groups:
+            print(f"Unknown server group: {selector}")
+        for name in describe_unknown(unknown, inventory):
+            print(f"Unknown server: {name}")
+        return 1 if unknown or unknown_groups else 0
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
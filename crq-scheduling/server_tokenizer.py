@@ -0,0 +1,146 @@
+"""
+Tokenizer for pasted server lists, splitting names that are concatenated ("abcprddb01abcprdap02"),
+pasted from spreadsheet columns or separated by any mix of delimiters.
+
+Server names follow the naming convention: a run of letters (application, environment and role
+codes) followed by a run of digits. The input is scanned once for "pieces", a run of letters
+with the digits that follow it, and since a name cannot start with a digit every piece holds at
+most one name. With the known hosts (e.g. a ServerInventory), a piece that is not a known host
+is kept as it was written, so it is reported as unknown rather than read as another server; the
+known host inside it ("prodabcprddb01", "abcprddb012" -> "abcprddb01") is only offered as a
+suggestion. Digits are only trimmed off for a suggestion when no host of that stem is numbered
+with as many digits, so "abcprddb011" does not suggest "abcprddb01" once abcprddb hosts with
+three-digit numbers exist.
+
+Example:
+    python server_tokenizer.py pasted-servers.txt
+    python server_tokenizer.py spreadsheet-dump.txt --inventory inventory.sqlite --count
+"""
+import argparse
+import logging
+import os
+import re
+import sys
+import time
+from functools import lru_cache
+
+# Configure logging
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
+
+# Organization's server naming convention
+SERVER_NAME_PATTERN = r'[a-z]+[a-z]{2}[a-z]?[a-z]{2}[v]?\d+'
+
+# Group selectors in pasted server input, expanded through a ServerInventory (e.g. "@aix-prod")
+SELECTOR_PATTERN = r'@[a-z0-9_.-]+'
+
+# Selectors, and runs of letters with the digits that follow them. Every alternative ends on a run
+# of a single character class, so the scan never backtracks and stays linear in the input size
+# (the naming convention regex itself backtracks quadratically on long runs of letters)
+TOKEN_PATTERN = re.compile(f"{SELECTOR_PATTERN}|[a-z]+[0-9]*")
+
+# Hosts the known-host search applies to (letters followed by digits)
+HOST_PATTERN = re.compile(r"([a-z]+)([0-9]+)")
+
+DIGITS = "0123456789"
+
+
+class ServerTokenizer:
+    """
+    Splits pasted server input into server names and "@group" selectors.
+
+    Every piece matching the naming convention is a server name. With hosts, pieces that hold a
+    known host without being one (letters or digits glued on, or mistyped) are returned too, as
+    written, so the caller reports them as unknown; suggestion() finds the known host inside
+    them. Hosts are indexed by their letter part ("stem") with the widths of their numbers, and
+    the shortest and longest stems bound where in a piece a host can start, so the search is a
+    fixed number of set lookups per piece.
+    """
+
+    def __init__(self, naming_pattern: str = SERVER_NAME_PATTERN, hosts=None):
+        self.naming_pattern = re.compile(naming_pattern)
+        self.hosts = hosts if hosts is not None else set()
+        widths = {}
+        for host in self.hosts:
+            match = HOST_PATTERN.fullmatch(host)
+            if match:
+                widths.setdefault(match.group(1), set()).add(len(match.group(2)))
+        # Widest numbers first, so the longest known host in a piece wins
+        self.stems = {stem: sorted(stem_widths, reverse=True) for stem, stem_widths in widths.items()}
+        self.min_stem = self.max_stem = 0
+        if self.stems:
+            self.min_stem = min(len(stem) for stem in self.stems)
+            self.max_stem = max(len(stem) for stem in self.stems)
+
+    def suggestion(self, piece: str) -> str:
+        """
+        Returns the known host inside a piece (letters then digits), preferring the longest stem
+        and then the longest number, or None. Callers offer it as a suggestion for a piece that is
+        not a known host itself, never use it in its place.
+        """
+        stem_end = len(piece.rstrip(DIGITS))
+        digits = len(piece) - stem_end
+        for start in range(max(0, stem_end - self.max_stem), stem_end - self.min_stem + 1):
+            widths = self.stems.get(piece[start:stem_end])
+            if not widths:
+                continue
+            for width in ((digits,) if digits in widths else widths):
+                if width <= digits and piece[start:stem_end + width] in self.hosts:
+                    return piece[start:stem_end + width]
+        return None
+
+    def tokenize(self, input_string: str) -> list:
+        """
+        Returns the server names and "@group" selectors of pasted input, in input order and
+        including duplicates.
+        """
+        tokens = []
+        # Bound once, as this loop runs for every word of a multi-megabyte paste
+        append = tokens.append
+        hosts = self.hosts
+        suggestion = self.suggestion if self.stems else None
+        is_name = self.naming_pattern.fullmatch
+        for piece in TOKEN_PATTERN.findall(input_string.lower()):
+            if piece[0] == "@":
+                append(piece)
+            elif piece[-1] in DIGITS:
+                if piece in hosts or is_name(piece) or (suggestion and suggestion(piece)):
+                    append(piece)
+        return tokens
+
+
+@lru_cache(maxsize=None)
+def convention_tokenizer(naming_pattern: str = SERVER_NAME_PATTERN) -> ServerTokenizer:
+    """
+    Returns the shared tokenizer of a naming convention, for input checked without an inventory.
+    """
+    return ServerTokenizer(naming_pattern)
+
+
+def main(argv: list = None) -> int:
+    parser = argparse.ArgumentParser(description="Split a pasted server list or spreadsheet dump into server names.")
+    parser.add_argument("input", help="Text file of pasted server names")
+    parser.add_argument("--inventory", help="Server inventory (.csv, .json or .sqlite) whose hosts are recognized inside glued text")
+    parser.add_argument("--count", action="store_true", help="Only report the number of names found and the throughput")
+    args = parser.parse_args(argv)
+
+    with open(args.input, encoding='utf-8', errors='replace') as f:
+        text = f.read()
+    tokenizer = convention_tokenizer()
+    if args.inventory:
+        from server_inventory import ServerInventory
+
+        tokenizer = ServerInventory.load(args.inventory).tokenizer()
+
+    start = time.perf_counter()
+    tokens = tokenizer.tokenize(text)
+    elapsed = time.perf_counter() - start
+    if not args.count:
+        seen = set()
+        print("\n".join(token for token in tokens if not (token in seen or seen.add(token))))
+    size = os.path.getsize(args.input) / 1e6
+    logging.info(f"{len(tokens)} names and selectors in {size:.1f} MB tokenized in {elapsed:.2f}s ({size / max(elapsed, 1e-9):.1f} MB/s).")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,6 @@
+import os
+import sys
+
+# The scripts import each other as top-level modules (e.g. "from crq_builder import ..."), as when
+# they are run from the crq-scheduling directory
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -0,0 +1,80 @@
+from datetime import datetime
+
+import pytest
+
+from crq_builder import (
+    build_crq, check_schedule, default_schedule, describe_unknown, recipe_schedules, resolve_servers,
+)
+from server_tokenizer import ServerTokenizer
+
+
+def test_check_schedule_accepts_a_window_of_at_least_an_hour():
+    check_schedule("12/11/2025", "22:00", "23:00")
+    check_schedule("12/11/2025", "00:00", "23:59")
+
+
+@pytest.mark.parametrize("run_date, start_time, end_time, message", [
+    ("2025-11-12", "22:00", "23:30", "Invalid run date"),
+    ("31/02/2025", "22:00", "23:30", "Invalid run date"),
+    ("12/11/2025", "25:00", "23:30", "Invalid start/end time"),
+    ("12/11/2025", "22:00", "", "Invalid start/end time"),
+    ("12/11/2025", "22:00", "22:59", "at least 1 hour after"),
+    ("12/11/2025", "22:30", "00:30", "at least 1 hour after"),
+])
+def test_check_schedule_rejects_malformed_or_short_windows(run_date, start_time, end_time, message):
+    with pytest.raises(ValueError, match=message):
+        check_schedule(run_date, start_time, end_time)
+
+
+@pytest.mark.parametrize("now, expected", [
+    (datetime(2025, 11, 12, 9, 15), ("12/11/2025", "10:15", "12:15")),
+    (datetime(2025, 11, 12, 20, 59), ("12/11/2025", "21:59", "23:59")),
+    (datetime(2025, 11, 12, 21, 30), ("13/11/2025", "00:00", "02:00")),
+    (datetime(2025, 11, 12, 23, 30), ("13/11/2025", "00:30", "02:30")),
+    (datetime(2025, 12, 31, 22, 0), ("01/01/2026", "00:00", "02:00")),
+])
+def test_default_schedule_never_runs_past_midnight(now, expected):
+    assert default_schedule(now) == expected
+    check_schedule(*expected)
+
+
+def test_recipe_schedules_checks_given_schedules_only():
+    assert len(recipe_schedules(["aix::install", "aix::verify"])) == 2
+    with pytest.raises(ValueError, match="at least 1 hour after"):
+        recipe_schedules(["aix::install"], ("12/11/2025", "22:30", "00:30"))
+
+
+def test_build_crq_lists_every_problem():
+    with pytest.raises(ValueError) as raised:
+        build_crq("913562", "", "aix_patch", "abcprddb01", schedule=("12/11/2025", "22:00", "22:30"))
+    assert len(raised.value.errors) == 3
+
+
+class Inventory:
+    # The part of ServerInventory that resolve_servers and describe_unknown use
+    def __init__(self, hosts):
+        self.hosts = set(hosts)
+
+    def __contains__(self, name):
+        return name in self.hosts
+
+    def tokenizer(self, naming_pattern):
+        return ServerTokenizer(naming_pattern, self.hosts)
+
+    def expand(self, selector):
+        raise KeyError(selector)
+
+
+@pytest.mark.parametrize("typo", ["abcprddb012", "xabcprddb01", "abcprddb0"])
+def test_one_character_typos_are_flagged_not_resolved(typo):
+    inventory = Inventory({"abcprddb01", "abcprdap02"})
+    servers, unknown, _ = resolve_servers(f"abcprdap02 {typo}", inventory)
+    assert servers == ["abcprdap02"]
+    assert unknown == [typo]
+    with pytest.raises(ValueError, match=f"Servers not in the inventory: {typo}"):
+        build_crq("CRQ000000913562", "Patching", "aix_patch", f"abcprdap02 {typo}", inventory=inventory)
+
+
+def test_unknown_names_suggest_the_host_they_hold():
+    inventory = Inventory({"abcprddb01"})
+    assert describe_unknown(["abcprddb012", "zzzprddb99"], inventory) == ["abcprddb012 (did you mean abcprddb01?)", "zzzprddb99"]
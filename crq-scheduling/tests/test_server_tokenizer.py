@@ -0,0 +1,36 @@
+import time
+
+from server_tokenizer import ServerTokenizer, convention_tokenizer
+
+
+def test_delimited_and_column_input():
+    text = "ABCPRDDB01, abcprdap02;abcuatdb03\tabcprdv04\nnot-a-server 12345"
+    assert convention_tokenizer().tokenize(text) == ["abcprddb01", "abcprdap02", "abcuatdb03", "abcprdv04"]
+
+
+def test_concatenated_names_are_split():
+    assert convention_tokenizer().tokenize("abcprddb01abcprdap02abcuatdb03") == ["abcprddb01", "abcprdap02", "abcuatdb03"]
+
+
+def test_selectors_and_duplicates_are_kept_in_order():
+    assert convention_tokenizer().tokenize("@aix-prod abcprddb01 abcprddb01 @db") == ["@aix-prod", "abcprddb01", "abcprddb01", "@db"]
+
+
+def test_pieces_holding_a_known_host_are_kept_as_written():
+    tokenizer = ServerTokenizer(hosts={"abcprddb01", "abcprdap02"})
+    assert tokenizer.tokenize("prodabcprddb01 abcprdap0210 abcprddb01") == ["prodabcprddb01", "abcprdap0210", "abcprddb01"]
+    assert tokenizer.suggestion("prodabcprddb01") == "abcprddb01"
+    assert tokenizer.suggestion("abcprdap0210") == "abcprdap02"
+
+
+def test_digits_are_not_suggested_away_when_hosts_use_that_width():
+    tokenizer = ServerTokenizer(hosts={"abcprddb01", "abcprddb100"})
+    assert tokenizer.suggestion("abcprddb011") is None
+    assert tokenizer.suggestion("abcprddb0110") == "abcprddb01"
+
+
+def test_long_letter_runs_tokenize_in_linear_time():
+    text = "a" * 200000 + "01"
+    start = time.perf_counter()
+    convention_tokenizer().tokenize(text)
+    assert time.perf_counter() - start < 1